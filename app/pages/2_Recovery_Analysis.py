@@ -6,16 +6,17 @@ Analizza TUTTI i dividendi storici per capire pattern di recovery
 import streamlit as st
 import sys
 from pathlib import Path
+import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
 import plotly.express as px
-from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent.parent.parent / 'src'))
 
 from database.models import Stock, Dividend, PriceData
+from database.engine import create_sqlite_engine
 
 st.set_page_config(
     page_title="Recovery Analysis",
@@ -37,34 +38,38 @@ require_authentication()
 # ============================================================================
 
 @st.cache_resource
-def get_database_session():
-    """Get database session"""
+def get_database_engine():
+    """Get database engine (condiviso: il pool di connessioni resta tra i rerun)"""
     db_path = Path(__file__).parent.parent.parent / "data" / "dividend_recovery.db"
-    engine = create_engine(f"sqlite:///{db_path}", echo=False)
-    Session = sessionmaker(bind=engine)
+    return create_sqlite_engine(db_path)
+
+
+def get_database_session():
+    """Get database session (nuova a ogni rerun: identity map non condivisa tra utenti)"""
+    Session = sessionmaker(bind=get_database_engine())
     return Session()
 
 
 def get_price_dataframe(session, stock_id):
     """Ottieni DataFrame prezzi ordinato per data"""
-    prices = session.query(PriceData).filter_by(
-        stock_id=stock_id
-    ).order_by(PriceData.date).all()
+    rows = session.query(
+        PriceData.date, PriceData.open, PriceData.high,
+        PriceData.low, PriceData.close, PriceData.volume
+    ).filter(PriceData.stock_id == stock_id).order_by(PriceData.date).all()
 
-    if not prices:
+    if not rows:
         return None
 
-    df = pd.DataFrame([{
-        'date': p.date,
-        'open': p.open,
-        'high': p.high,
-        'low': p.low,
-        'close': p.close,
-        'volume': p.volume
-    } for p in prices])
+    # Costruzione per colonne (un array per colonna, niente dict per riga)
+    dates, opens, highs, lows, closes, volumes = zip(*rows)
 
-    df['date'] = pd.to_datetime(df['date'])
-    df = df.set_index('date')
+    df = pd.DataFrame({
+        'open': np.asarray(opens, dtype=np.float64),
+        'high': np.asarray(highs, dtype=np.float64),
+        'low': np.asarray(lows, dtype=np.float64),
+        'close': np.asarray(closes, dtype=np.float64),
+        'volume': list(volumes)  # Integer nullable: int64, o float64 se mancano valori
+    }, index=pd.DatetimeIndex(pd.to_datetime(dates), name='date'))
 
     return df
 
@@ -84,8 +89,9 @@ def find_recovery(df, start_date, target_price, max_days=30):
     """
     start_date = pd.Timestamp(start_date)
 
-    # Filtra dati >= start_date e prendi max_days
-    future_data = df[df.index >= start_date].head(max_days)
+    # Prendi max_days righe da start_date in poi (ricerca binaria, indice ordinato)
+    start_idx = df.index.searchsorted(start_date, side='left')
+    future_data = df.iloc[start_idx:start_idx + max_days]
 
     if future_data.empty:
         return {
@@ -96,22 +102,24 @@ def find_recovery(df, start_date, target_price, max_days=30):
             'reason': 'no_data'
         }
 
-    # Cerca primo giorno con close >= target
-    # enumerate parte da 0: giorno 0 = stesso giorno (D0)
-    for i, (date, row) in enumerate(future_data.iterrows()):
-        if row['close'] >= target_price:
-            return {
-                'recovery_date': date,
-                'recovery_days': i,  # 0 = stesso giorno, 1 = giorno dopo, ecc.
-                'recovery_price': row['close'],
-                'recovered': True,
-                'reason': 'recovered'
-            }
+    # Cerca primo giorno con close >= target (confronto vettoriale)
+    # posizione 0 = stesso giorno (D0)
+    closes = future_data['close'].to_numpy()
+    hits = closes >= target_price
+    if hits.any():
+        i = int(hits.argmax())
+        return {
+            'recovery_date': future_data.index[i],
+            'recovery_days': i,  # 0 = stesso giorno, 1 = giorno dopo, ecc.
+            'recovery_price': closes[i],
+            'recovered': True,
+            'reason': 'recovered'
+        }
 
     # Non ha recuperato entro max_days
     # Restituisci l'ultimo giorno disponibile
     last_date = future_data.index[-1]
-    last_price = future_data.iloc[-1]['close']
+    last_price = closes[-1]
 
     # Calcola giorni trascorsi da start_date all'ultimo giorno disponibile
     days_passed = (last_date - start_date).days
@@ -137,20 +145,21 @@ def analyze_all_dividends(df, dividends):
     for div in dividends:
         ex_date = pd.Timestamp(div.ex_date)
 
+        # Posizione di D0 (ricerca binaria, indice ordinato): D-1 = ex_idx - 1
+        ex_idx = df.index.searchsorted(ex_date, side='left')
+
         # Trova D-1 close (target recovery)
-        dates_before = df[df.index < ex_date]
-        if dates_before.empty:
+        if ex_idx == 0:
             continue
 
-        d_minus_1 = dates_before.index[-1]
-        target_price = df.loc[d_minus_1, 'close']
+        target_price = df['close'].iat[ex_idx - 1]
 
         # Prezzi D0
-        if ex_date not in df.index:
+        if ex_idx == len(df.index) or df.index[ex_idx] != ex_date:
             continue
 
-        d0_open = df.loc[ex_date, 'open']
-        d0_close = df.loc[ex_date, 'close']
+        d0_open = df['open'].iat[ex_idx]
+        d0_close = df['close'].iat[ex_idx]
 
         # Gap
         gap = target_price - d0_open
@@ -214,6 +223,7 @@ if df is None:
 dividends = session.query(Dividend).filter_by(stock_id=stock.id).order_by(
     Dividend.ex_date.desc()
 ).all()
+session.close()  # oggetti già caricati: la sessione non serve oltre
 
 if not dividends:
     st.warning(f"⚠️ Nessun dividendo per {stock.ticker}")
@@ -236,29 +246,31 @@ st.success(f"✅ Analizzati {len(analysis_df)} dividendi storici!")
 st.divider()
 st.subheader("📋 Tabella Completa Dividendi")
 
+def format_values(values, fmt):
+    """Formatta una colonna numerica in blocco (printf-style, nessuna lambda per riga)"""
+    return np.char.mod(fmt, np.asarray(values, dtype=np.float64))
+
 # Formatta tabella per display
 display_df = analysis_df.copy()
 display_df['ex_date'] = pd.to_datetime(display_df['ex_date']).dt.strftime('%Y-%m-%d')
 display_df['recovery_date'] = pd.to_datetime(display_df['recovery_date']).dt.strftime('%Y-%m-%d')
-display_df['dividend'] = display_df['dividend'].apply(lambda x: f"€{x:.3f}")
-display_df['div_yield'] = display_df['div_yield'].apply(lambda x: f"{x:.2f}%")
-display_df['d_minus_1_close'] = display_df['d_minus_1_close'].apply(lambda x: f"€{x:.3f}")
-display_df['d0_open'] = display_df['d0_open'].apply(lambda x: f"€{x:.3f}")
-display_df['gap'] = display_df['gap'].apply(lambda x: f"€{x:.3f}")
-display_df['gap_pct'] = display_df['gap_pct'].apply(lambda x: f"{x:.2f}%")
+display_df['dividend'] = format_values(display_df['dividend'], '€%.3f')
+display_df['div_yield'] = format_values(display_df['div_yield'], '%.2f%%')
+display_df['d_minus_1_close'] = format_values(display_df['d_minus_1_close'], '€%.3f')
+display_df['d0_open'] = format_values(display_df['d0_open'], '€%.3f')
+display_df['gap'] = format_values(display_df['gap'], '€%.3f')
+display_df['gap_pct'] = format_values(display_df['gap_pct'], '%.2f%%')
 
 # Recovered con emoji + reason
-def format_recovered(row):
-    if row['recovered']:
-        return f"✅ ({row['recovery_days']}gg)"
-    else:
-        reason_map = {
-            'not_recovered': f"❌ No recovery",
-            'insufficient_data': f"⚠️ Dati incompleti"
-        }
-        return reason_map.get(row['reason'], "❌")
-
-display_df['status'] = display_df.apply(format_recovered, axis=1)
+reason_map = {
+    'not_recovered': "❌ No recovery",
+    'insufficient_data': "⚠️ Dati incompleti"
+}
+display_df['status'] = np.where(
+    display_df['recovered'].to_numpy(dtype=bool),
+    [f"✅ ({d}gg)" for d in display_df['recovery_days'].tolist()],
+    display_df['reason'].map(reason_map).fillna("❌").to_numpy()
+)
 
 # Seleziona e rinomina colonne
 display_df = display_df[[
@@ -460,6 +472,7 @@ Colonne tabella:
 # STEP 2: Costruisci tabella price evolution con D+40
 evolution_data = []
 checkpoints = [5, 10, 15, 20, 30, 40]  # Aggiunto D+40
+closes = df['close'].to_numpy()  # accesso posizionale, niente lookup per etichetta
 
 for _, div_row in analysis_df.iterrows():
     ex_date = pd.Timestamp(div_row['ex_date'])
@@ -475,12 +488,11 @@ for _, div_row in analysis_df.iterrows():
     for days in checkpoints:
         future_date = ex_date + pd.Timedelta(days=days)
 
-        # Cerca il prezzo a quella data (o il più vicino)
-        future_prices = df[df.index >= future_date]
+        # Cerca il prezzo a quella data (o il primo successivo)
+        pos = df.index.searchsorted(future_date, side='left')
 
-        if not future_prices.empty:
-            actual_date = future_prices.index[0]
-            price = future_prices.iloc[0]['close']
+        if pos < len(closes):
+            price = closes[pos]
             pct_change = ((price - target_price) / target_price) * 100
 
             row_data[f'd_plus_{days}'] = price
@@ -496,23 +508,23 @@ evolution_df = pd.DataFrame(evolution_data)
 # STEP 3: Formatta per display con colori
 display_evolution = evolution_df.copy()
 display_evolution['ex_date'] = pd.to_datetime(display_evolution['ex_date']).dt.strftime('%Y-%m-%d')
-display_evolution['dividend'] = display_evolution['dividend'].apply(lambda x: f"€{x:.3f}")
-display_evolution['d_minus_1_close'] = display_evolution['d_minus_1_close'].apply(lambda x: f"€{x:.3f}")
+display_evolution['dividend'] = format_values(display_evolution['dividend'], '€%.3f')
+display_evolution['d_minus_1_close'] = format_values(display_evolution['d_minus_1_close'], '€%.3f')
 
-# Formatta colonne D+N con prezzo e %
+# Formatta colonne D+N con prezzo e % ("€p (+x.x%)", "N/A" se manca il prezzo)
 for days in checkpoints:
     price_col = f'd_plus_{days}'
     pct_col = f'd_plus_{days}_pct'
 
-    def format_price_pct(row):
-        price = row[price_col]
-        pct = row[pct_col]
-        if pd.isna(price):
-            return "N/A"
-        sign = "+" if pct >= 0 else ""
-        return f"€{price:.3f} ({sign}{pct:.1f}%)"
+    price = np.asarray(display_evolution[price_col], dtype=np.float64)
+    pct = np.asarray(display_evolution[pct_col], dtype=np.float64)
+    sign = np.where(pct >= 0, '+', '')
+    text = np.char.add(
+        np.char.add(np.char.add(format_values(price, '€%.3f ('), sign), format_values(pct, '%.1f%%')),
+        ')'
+    )
 
-    display_evolution[f'D+{days}'] = display_evolution.apply(format_price_pct, axis=1)
+    display_evolution[f'D+{days}'] = np.where(np.isnan(price), "N/A", text)
     display_evolution = display_evolution.drop(columns=[price_col, pct_col])
 
 # Seleziona colonne finali
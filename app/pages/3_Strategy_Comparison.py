@@ -6,15 +6,18 @@ Confronto LONG D-1 vs LONG D0 vs SHORT+LONG con dati REALI e recovery detection
 import streamlit as st
 import sys
 from pathlib import Path
+import numpy as np
 import pandas as pd
 from datetime import timedelta
-from sqlalchemy import create_engine
+from sqlalchemy import select
 from sqlalchemy.orm import sessionmaker
 
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent.parent.parent / 'src'))
 
 from database.models import Stock, Dividend, PriceData
+from database.engine import create_sqlite_engine
+from strategies import scan_recovery, PriceSeries
 
 st.set_page_config(
     page_title="Strategy Comparison",
@@ -117,205 +120,219 @@ BROKER_CONFIGS = {
     'Interactive Brokers - UK': IB_UK_CONFIG
 }
 
+# Tassi giornalieri (overnight, short) precalcolati per broker, senza toccare
+# le configurazioni: chiave = broker_config['name']
+BROKER_DAILY_RATES = {
+    cfg['name']: (cfg['overnight_rate'] / 365, cfg['short_cost_rate'] / 365)
+    for cfg in BROKER_CONFIGS.values()
+}
+
 
 def calculate_commission(controvalore, broker_config):
     """
     Calcola commissione in base al broker e mercato selezionato
 
+    Vettoriale: accetta uno scalare o un array di controvalori
+    (es. tutti i trade di uno sweep sui dividendi) in una sola operazione.
+
     Args:
-        controvalore: Valore della transazione in EUR
+        controvalore: Valore della transazione in EUR (scalare o array)
         broker_config: Dizionario configurazione broker
 
     Returns:
-        Commissione in EUR
+        Commissione in EUR (float per input scalare, altrimenti np.ndarray)
     """
     market = broker_config.get('market', 'Italia')
+    value = np.asarray(controvalore, dtype=np.float64)
+    comm = value * broker_config['commission_rate']
 
     # UK: flat £3 fino a £6000, poi 0.05%
     if market == 'UK':
         flat_threshold = broker_config.get('commission_flat_threshold', 6000.0)
-        if controvalore <= flat_threshold:
-            return broker_config.get('commission_flat', 3.0)
-        else:
-            return controvalore * broker_config['commission_rate']
+        comm = np.where(value <= flat_threshold, broker_config.get('commission_flat', 3.0), comm)
 
     # USA: approssimazione con 0.05% (in realtà $0.005/share, ma senza share count usiamo %)
     # Min $1.00, max 1% of trade value
-    if market == 'USA':
-        comm = controvalore * broker_config['commission_rate']
-        comm = max(broker_config['commission_min'], comm)
+    elif market == 'USA':
         max_pct = broker_config.get('commission_max_pct', 0.01)
-        comm = min(comm, controvalore * max_pct)
-        return comm
+        comm = np.minimum(np.maximum(comm, broker_config['commission_min']), value * max_pct)
 
-    # Italia e altri: percentuale standard con min/max
-    comm = controvalore * broker_config['commission_rate']
-    comm = max(broker_config['commission_min'], comm)
-
-    if broker_config['commission_max'] is not None:
-        comm = min(comm, broker_config['commission_max'])
+    # Italia e altri: percentuale standard con min/max (max None = nessun massimale)
+    else:
+        comm = np.clip(comm, broker_config['commission_min'], broker_config['commission_max'])
 
-    return comm
+    return float(comm) if comm.ndim == 0 else comm
 
 
 # ============================================================================
 # FUNZIONI CORE - RECOVERY DETECTION
 # ============================================================================
 
-def get_price_dataframe(session, stock_id):
-    """Ottieni DataFrame prezzi ordinato per data"""
-    prices = session.query(PriceData).filter_by(
-        stock_id=stock_id
-    ).order_by(PriceData.date).all()
-    
-    if not prices:
+def get_price_dataframe(conn, stock_id):
+    """
+    Ottieni DataFrame prezzi (solo open/close) ordinato per data
+
+    Le strategie usano solo open e close: high/low/volume non vengono letti.
+    La query Core va direttamente in pandas: le date ISO vengono convertite
+    dal reader (parse_dates) e il DataFrame arriva già indicizzato per data.
+    """
+    stmt = (
+        select(PriceData.date, PriceData.open, PriceData.close)
+        .where(PriceData.stock_id == stock_id)
+        .order_by(PriceData.date)
+    )
+    df = pd.read_sql_query(
+        stmt, conn,
+        parse_dates=['date'], index_col='date',
+        dtype={'open': np.float64, 'close': np.float64}
+    )
+
+    if df.empty:
         return None
-    
-    df = pd.DataFrame([{
-        'date': p.date,
-        'open': p.open,
-        'high': p.high,
-        'low': p.low,
-        'close': p.close,
-        'volume': p.volume
-    } for p in prices])
-    
-    df['date'] = pd.to_datetime(df['date'])
-    df = df.set_index('date')
-    
+
     return df
 
 
-def find_recovery(df, start_date, target_price, max_days=30):
+def _day_ordinals(dates):
+    """Date -> giorni dall'epoch (int64), per aritmetica senza Timestamp"""
+    return np.asarray(dates, dtype='datetime64[D]').astype(np.int64)
+
+
+def _locate_ex_date(prices, ex_ord):
+    """
+    Posizioni di D-1 e D0 nella serie (ricerca binaria, date ordinate)
+
+    Returns:
+        (prev_idx, ex_idx): prev_idx = -1 se non c'è storico prima dello
+        stacco, ex_idx = None se l'ex-date non è un giorno di borsa nei dati
+    """
+    ex_idx = int(np.searchsorted(prices.date_ords, ex_ord, side='left'))
+    prev_idx = ex_idx - 1
+    if ex_idx >= len(prices) or prices.date_ords[ex_idx] != ex_ord:
+        return prev_idx, None
+    return prev_idx, ex_idx
+
+
+def find_recovery(prices, start_date, target_price, max_days=30):
     """
     Cerca il PRIMO giorno in cui il prezzo close >= target_price
     
     Args:
-        df: DataFrame con prezzi (index = date)
+        prices: PriceSeries (array date/open/close ordinati per data)
         start_date: Data da cui iniziare (D0)
         target_price: Prezzo da recuperare (D-1 close)
         max_days: Giorni massimi di ricerca
     
     Returns:
-        dict con recovery_date, recovery_days, recovery_price, recovered
+        dict con recovery_date, recovery_idx, recovery_days, recovery_price, recovered
     """
-    start_date = pd.Timestamp(start_date)
-    
-    # Filtra dati >= start_date e prendi max_days
-    future_data = df[df.index >= start_date].head(max_days)
-    
-    if future_data.empty:
+    # D0 via ricerca binaria, poi scansione nel kernel condiviso
+    # giorni: di borsa se recupera (0 = stesso giorno D0), altrimenti
+    # giorni REALI trascorsi da start_date all'ultimo giorno disponibile
+    start_ord = _day_ordinals(pd.Timestamp(start_date).to_datetime64())
+    start_idx = int(np.searchsorted(prices.date_ords, start_ord, side='left'))
+    i, days, recovered = scan_recovery(
+        prices.closes, prices.date_ords, start_idx, start_ord, float(target_price), max_days
+    )
+
+    if i < 0:
         return {
             'recovery_date': None,
+            'recovery_idx': None,
             'recovery_days': None,
             'recovery_price': None,
             'recovered': False
         }
-    
-    # Cerca primo giorno con close >= target
-    # enumerate parte da 0: giorno 0 = stesso giorno (D0)
-    for i, (date, row) in enumerate(future_data.iterrows()):
-        if row['close'] >= target_price:
-            return {
-                'recovery_date': date,
-                'recovery_days': i,  # 0 = stesso giorno, 1 = giorno dopo, ecc.
-                'recovery_price': row['close'],
-                'recovered': True
-            }
-    
-    # Non ha recuperato entro max_days
-    # Restituisci l'ultimo giorno disponibile
-    last_date = future_data.index[-1]
-    last_price = future_data.iloc[-1]['close']
-    
-    # Calcola giorni trascorsi da start_date all'ultimo giorno disponibile
-    days_passed = (last_date - start_date).days
-    
+
+    # Se non ha recuperato entro max_days è l'ultimo giorno disponibile
     return {
-        'recovery_date': last_date,
-        'recovery_days': days_passed,  # Giorni REALI trascorsi
-        'recovery_price': last_price,
-        'recovered': False
+        'recovery_date': prices.date_at(i),
+        'recovery_idx': int(i),
+        'recovery_days': int(days),
+        'recovery_price': prices.closes[i],
+        'recovered': bool(recovered)
     }
 
 
-# ============================================================================
-# STRATEGIA A: LONG CON DIVIDENDO
-# ============================================================================
-
-def strategy_long_with_dividend(df, ex_date, dividend_amount, leverage, capital, broker_config):
+def prepare_dividend_event(prices, ex_date):
     """
-    STRATEGIA A: Compra D-1 close, incassa dividendo, vende al recovery
+    Dati comuni alle strategie per uno stacco: D-1, D0 e recovery verso D-1 close
 
-    Entry: D-1 alle 17:25 (approssimato con close)
-    Exit: Primo giorno con close >= D-1 close
+    A e B hanno lo stesso target di recovery (D-1 close) e partono entrambe
+    da D0: il lavoro viene fatto una volta sola e condiviso.
     """
     ex_date = pd.Timestamp(ex_date)
 
-    # Trova D-1
-    dates_before = df[df.index < ex_date]
-    if dates_before.empty:
+    prev_idx, ex_idx = _locate_ex_date(prices, _day_ordinals(ex_date.to_datetime64()))
+    if prev_idx < 0:
         return {'error': 'Nessun dato prima dello stacco'}
 
-    d_minus_1 = dates_before.index[-1]
-    buy_price = df.loc[d_minus_1, 'close']
+    d1_close = prices.closes[prev_idx]
+
+    return {
+        'ex_date': ex_date,
+        'prev_idx': prev_idx,
+        'ex_idx': ex_idx,
+        'd_minus_1': prices.date_at(prev_idx),
+        'd1_close': d1_close,
+        'date_ords': prices.date_ords,
+        'recovery': find_recovery(prices, ex_date, target_price=d1_close, max_days=30)
+    }
+
+
+def _pnl_leg(event, buy_idx, buy_price, dividend_amount, leverage, capital, broker_config):
+    """
+    P&L e costi di una gamba long: acquisto a buy_idx, vendita al recovery
+
+    Comune alle strategie: cambiano solo il punto di ingresso e se il
+    dividendo viene incassato (dividend_amount = 0.0 se no).
+    """
+    recovery = event['recovery']
+    sell_price = recovery['recovery_price']
 
     # Calcola posizione
     shares = (capital * leverage) / buy_price
     exposure = shares * buy_price
-
-    # Cerca recovery (da D0 in poi)
-    recovery = find_recovery(df, ex_date, target_price=buy_price, max_days=30)
-
-    if not recovery['recovered']:
-        # Non ha recuperato: vendi comunque all'ultimo giorno
-        sell_date = recovery['recovery_date']
-        sell_price = recovery['recovery_price']
-        recovered = False
-    else:
-        sell_date = recovery['recovery_date']
-        sell_price = recovery['recovery_price']
-        recovered = True
+    sell_value = shares * sell_price
 
     # P&L
     price_gain = (sell_price - buy_price) * shares
     dividend_income = dividend_amount * shares
     gross_profit = price_gain + dividend_income
 
-    # COSTI
-    # 1. Commissioni: buy + sell
-    comm_buy = calculate_commission(exposure, broker_config)
-    comm_sell = calculate_commission(shares * sell_price, broker_config)
+    # COSTI: controvalori delle gambe [buy, sell], tassati in un solo passaggio
+    notionals = np.array([exposure, sell_value])
 
-    # 2. Tobin tax (Italia)
-    tobin_buy = exposure * broker_config['tobin_tax_rate']
-    tobin_sell = (shares * sell_price * broker_config['tobin_tax_rate']) if broker_config['tobin_tax_on_sell'] else 0.0
-    tobin = tobin_buy + tobin_sell
+    # 1. Commissioni: buy + sell (una chiamata vettoriale)
+    comm_buy, comm_sell = (float(c) for c in calculate_commission(notionals, broker_config))
+
+    # 2. Tobin tax (Italia): la maschera indica quali gambe la pagano
+    tobin_legs = np.array([1.0, 1.0 if broker_config['tobin_tax_on_sell'] else 0.0])
+    tobin = float(notionals @ tobin_legs) * broker_config['tobin_tax_rate']
 
     # 3. Stamp Duty (UK)
-    stamp_duty_buy = exposure * broker_config.get('stamp_duty_rate', 0.0)
-    stamp_duty_sell = (shares * sell_price * broker_config.get('stamp_duty_rate', 0.0)) if broker_config.get('stamp_duty_on_sell', False) else 0.0
-    stamp_duty = stamp_duty_buy + stamp_duty_sell
+    stamp_legs = np.array([1.0, 1.0 if broker_config.get('stamp_duty_on_sell', False) else 0.0])
+    stamp_duty = float(notionals @ stamp_legs) * broker_config.get('stamp_duty_rate', 0.0)
 
-    # 4. Overnight: da D-1 a sell_date
-    overnight_days = (sell_date - d_minus_1).days
-    overnight_cost = (exposure * broker_config['overnight_rate'] / 365) * overnight_days
+    # 4. Overnight: da ingresso a sell_date (giorni di calendario)
+    date_ords = event['date_ords']
+    overnight_days = int(date_ords[recovery['recovery_idx']] - date_ords[buy_idx])
+    overnight_rate_daily, _ = BROKER_DAILY_RATES[broker_config['name']]
+    overnight_cost = exposure * overnight_rate_daily * overnight_days
 
     total_costs = comm_buy + comm_sell + tobin + stamp_duty + overnight_cost
     net_profit = gross_profit - total_costs
     roi = (net_profit / capital) * 100
-    
+
     return {
-        'strategy': 'LONG D-1 (con dividendo)',
-        'buy_date': d_minus_1,
         'buy_price': buy_price,
-        'sell_date': sell_date,
+        'sell_date': recovery['recovery_date'],
         'sell_price': sell_price,
         'shares': shares,
         'exposure': exposure,
         'leverage': leverage,
         'recovery_days': recovery['recovery_days'],
-        'recovered': recovered,
+        'recovered': recovery['recovered'],  # se False: vendita forzata all'ultimo giorno
         'price_gain': price_gain,
         'dividend_income': dividend_income,
         'gross_profit': gross_profit,
@@ -330,100 +347,90 @@ def strategy_long_with_dividend(df, ex_date, dividend_amount, leverage, capital,
     }
 
 
+# ============================================================================
+# STRATEGIA A: LONG CON DIVIDENDO
+# ============================================================================
+
+def strategy_long_with_dividend(prices, ex_date, dividend_amount, leverage, capital, broker_config, event=None):
+    """
+    STRATEGIA A: Compra D-1 close, incassa dividendo, vende al recovery
+
+    Entry: D-1 alle 17:25 (approssimato con close)
+    Exit: Primo giorno con close >= D-1 close
+
+    event: risultato di prepare_dividend_event (calcolato qui se assente)
+    """
+    if event is None:
+        event = prepare_dividend_event(prices, ex_date)
+    if 'error' in event:
+        return {'error': event['error']}
+
+    # Entry: D-1 close, con dividendo
+    leg = _pnl_leg(event, event['prev_idx'], event['d1_close'], dividend_amount,
+                   leverage, capital, broker_config)
+
+    return {
+        'strategy': 'LONG D-1 (con dividendo)',
+        'buy_date': event['d_minus_1'],
+        **leg
+    }
+
+
 # ============================================================================
 # STRATEGIA B: LONG SENZA DIVIDENDO
 # ============================================================================
 
-def strategy_long_without_dividend(df, ex_date, dividend_amount, leverage, capital, broker_config):
+def strategy_long_without_dividend(prices, ex_date, dividend_amount, leverage, capital, broker_config, event=None):
     """
     STRATEGIA B: Compra D0 open, NO dividendo, vende al recovery
 
     Entry: D0 alle 09:05 (approssimato con open)
     Exit: Primo giorno con close >= D-1 close (stesso target di A!)
-    """
-    ex_date = pd.Timestamp(ex_date)
-
-    # Trova D-1 close (target recovery)
-    dates_before = df[df.index < ex_date]
-    if dates_before.empty:
-        return {'error': 'Nessun dato prima dello stacco'}
 
-    d_minus_1 = dates_before.index[-1]
-    target_price = df.loc[d_minus_1, 'close']
+    event: risultato di prepare_dividend_event (calcolato qui se assente)
+    """
+    if event is None:
+        event = prepare_dividend_event(prices, ex_date)
+    if 'error' in event:
+        return {'error': event['error']}
 
     # Entry: D0 open
-    if ex_date not in df.index:
+    ex_idx = event['ex_idx']
+    if ex_idx is None:
         return {'error': 'Ex-date non presente nei dati'}
 
-    buy_price = df.loc[ex_date, 'open']
+    # NO dividendo
+    leg = _pnl_leg(event, ex_idx, prices.opens[ex_idx], 0.0,
+                   leverage, capital, broker_config)
 
-    # Calcola posizione
-    shares = (capital * leverage) / buy_price
-    exposure = shares * buy_price
-
-    # Cerca recovery (da D0 in poi, stesso target di A)
-    recovery = find_recovery(df, ex_date, target_price=target_price, max_days=30)
-
-    if not recovery['recovered']:
-        sell_date = recovery['recovery_date']
-        sell_price = recovery['recovery_price']
-        recovered = False
-    else:
-        sell_date = recovery['recovery_date']
-        sell_price = recovery['recovery_price']
-        recovered = True
+    return {
+        'strategy': 'LONG D0 (senza dividendo)',
+        'buy_date': event['ex_date'],
+        'target_price': event['d1_close'],  # D-1 close (target recovery)
+        **leg
+    }
 
-    # P&L
-    price_gain = (sell_price - buy_price) * shares
-    dividend_income = 0.0  # NO dividendo
-    gross_profit = price_gain
 
-    # COSTI
-    comm_buy = calculate_commission(exposure, broker_config)
-    comm_sell = calculate_commission(shares * sell_price, broker_config)
+STRATEGIES = [
+    ('A', strategy_long_with_dividend),
+    ('B', strategy_long_without_dividend)
+]
 
-    # Tobin tax (Italia)
-    tobin_buy = exposure * broker_config['tobin_tax_rate']
-    tobin_sell = (shares * sell_price * broker_config['tobin_tax_rate']) if broker_config['tobin_tax_on_sell'] else 0.0
-    tobin = tobin_buy + tobin_sell
 
-    # Stamp Duty (UK)
-    stamp_duty_buy = exposure * broker_config.get('stamp_duty_rate', 0.0)
-    stamp_duty_sell = (shares * sell_price * broker_config.get('stamp_duty_rate', 0.0)) if broker_config.get('stamp_duty_on_sell', False) else 0.0
-    stamp_duty = stamp_duty_buy + stamp_duty_sell
+def run_strategies(prices, ex_date, dividend_amount, leverage, capital, broker_config):
+    """
+    Batch unico: evento (D-1/D0/recovery) calcolato una volta, poi tutte le strategie
 
-    # Overnight: da D0 a sell_date
-    overnight_days = (sell_date - ex_date).days
-    overnight_cost = (exposure * broker_config['overnight_rate'] / 365) * overnight_days
+    Nessuna chiamata st.*; il pulsante lo esegue in linea, senza worker thread.
 
-    total_costs = comm_buy + comm_sell + tobin + stamp_duty + overnight_cost
-    net_profit = gross_profit - total_costs
-    roi = (net_profit / capital) * 100
-    
-    return {
-        'strategy': 'LONG D0 (senza dividendo)',
-        'buy_date': ex_date,
-        'buy_price': buy_price,
-        'sell_date': sell_date,
-        'sell_price': sell_price,
-        'shares': shares,
-        'exposure': exposure,
-        'leverage': leverage,
-        'recovery_days': recovery['recovery_days'],
-        'recovered': recovered,
-        'target_price': target_price,
-        'price_gain': price_gain,
-        'dividend_income': dividend_income,
-        'gross_profit': gross_profit,
-        'comm_buy': comm_buy,
-        'comm_sell': comm_sell,
-        'tobin_tax': tobin,
-        'stamp_duty': stamp_duty,
-        'overnight_cost': overnight_cost,
-        'total_costs': total_costs,
-        'net_profit': net_profit,
-        'roi': roi
-    }
+    Returns:
+        lista di (label, risultato) nell'ordine di STRATEGIES
+    """
+    event = prepare_dividend_event(prices, ex_date)
+    return [
+        (label, fn(prices, ex_date, dividend_amount, leverage, capital, broker_config, event))
+        for label, fn in STRATEGIES
+    ]
 
 
 # ============================================================================
@@ -431,14 +438,26 @@ def strategy_long_without_dividend(df, ex_date, dividend_amount, leverage, capit
 # ============================================================================
 
 @st.cache_resource
-def get_database_session():
-    """Get database session"""
+def get_database_engine():
+    """Get database engine (condiviso: il pool di connessioni resta tra i rerun)"""
     db_path = Path(__file__).parent.parent.parent / "data" / "dividend_recovery.db"
-    engine = create_engine(f"sqlite:///{db_path}", echo=False)
-    Session = sessionmaker(bind=engine)
+    return create_sqlite_engine(db_path)
+
+
+def get_database_session():
+    """Get database session (nuova a ogni rerun: identity map non condivisa tra utenti)"""
+    Session = sessionmaker(bind=get_database_engine())
     return Session()
 
 
+@st.cache_data(ttl=300)
+def _load_prices(stock_id):
+    """Prezzi del titolo come PriceSeries (array NumPy), cachati per stock_id tra i rerun"""
+    with get_database_engine().connect() as conn:
+        df = get_price_dataframe(conn, stock_id)
+    return PriceSeries.from_frame(df) if df is not None else None
+
+
 st.title("⚙️ Confronto Strategie A vs B")
 st.markdown("""
 Confronto **2 strategie** con **dati storici REALI** e **recovery detection automatico**:
@@ -514,8 +533,8 @@ selected = st.selectbox("Seleziona Titolo", list(stock_options.keys()))
 stock = stock_options[selected]
 
 # Get price data
-df = get_price_dataframe(session, stock.id)
-if df is None:
+prices = _load_prices(stock.id)
+if prices is None:
     st.error("❌ Nessun dato prezzi per questo titolo")
     st.stop()
 
@@ -523,6 +542,7 @@ if df is None:
 dividends = session.query(Dividend).filter_by(stock_id=stock.id).order_by(
     Dividend.ex_date.desc()
 ).all()
+session.close()  # oggetti già caricati: la sessione non serve oltre
 
 if not dividends:
     st.warning(f"⚠️ Nessun dividendo per {stock.ticker}")
@@ -556,20 +576,19 @@ if st.button("🚀 Calcola con Dati REALI", type="primary"):
     with st.spinner("Analisi dati storici in corso..."):
         try:
             results = []
-            
-            # Strategia A
-            r_a = strategy_long_with_dividend(df, dividend.ex_date, dividend.amount, leverage, capital, broker_config)
-            if 'error' not in r_a:
-                results.append(r_a)
-            else:
-                st.error(f"Strategia A: {r_a['error']}")
-
-            # Strategia B
-            r_b = strategy_long_without_dividend(df, dividend.ex_date, dividend.amount, leverage, capital, broker_config)
-            if 'error' not in r_b:
-                results.append(r_b)
-            else:
-                st.error(f"Strategia B: {r_b['error']}")
+
+            # Tutte le strategie in un unico batch (funzioni pure, nessuna
+            # chiamata st.*); gli errori vengono mostrati qui sotto.
+            # Eseguite sul thread dello script: A e B costano qualche decina di
+            # µs in tutto e tengono il GIL, un thread pool li rallenterebbe
+            outputs = run_strategies(prices, dividend.ex_date, dividend.amount,
+                                     leverage, capital, broker_config)
+
+            for label, r in outputs:
+                if 'error' not in r:
+                    results.append(r)
+                else:
+                    st.error(f"Strategia {label}: {r['error']}")
             
             if not results:
                 st.error("❌ Nessuna strategia calcolabile")
@@ -580,17 +599,26 @@ if st.button("🚀 Calcola con Dati REALI", type="primary"):
             # Tabella comparativa
             st.subheader("📊 Risultati Comparativi")
             
-            comparison = pd.DataFrame([{
-                'Strategia': r['strategy'],
-                'ROI %': f"{r['roi']:.2f}%",
-                'Net Profit': f"€{r['net_profit']:.2f}",
-                'Gross Profit': f"€{r['gross_profit']:.2f}",
-                'Costi Totali': f"€{r['total_costs']:.2f}",
-                'Recovery Days': r['recovery_days'] if r['recovered'] else f"{r['recovery_days']}*",
-                'Recovered': '✅' if r['recovered'] else '❌'
-            } for r in results])
-            
-            st.dataframe(comparison, use_container_width=True, hide_index=True)
+            # Colonne numeriche (ordinabili); la formattazione la fa lo Styler
+            recovered = np.array([r['recovered'] for r in results])
+            comparison = pd.DataFrame({
+                'Strategia': [r['strategy'] for r in results],
+                'ROI %': [r['roi'] for r in results],
+                'Net Profit': [r['net_profit'] for r in results],
+                'Gross Profit': [r['gross_profit'] for r in results],
+                'Costi Totali': [r['total_costs'] for r in results],
+                'Recovery Days': [r['recovery_days'] for r in results],
+                'Recovered': np.where(recovered, '✅', '❌')
+            })
+
+            comparison_style = comparison.style.format({
+                'ROI %': '{:.2f}%',
+                'Net Profit': '€{:.2f}',
+                'Gross Profit': '€{:.2f}',
+                'Costi Totali': '€{:.2f}'
+            }).format('{}*', subset=pd.IndexSlice[comparison.index[~recovered], ['Recovery Days']])
+
+            st.dataframe(comparison_style, use_container_width=True, hide_index=True)
             
             if not all(r['recovered'] for r in results):
                 st.warning("⚠️ * = Non ha recuperato entro 30 giorni (vendita forzata)")
@@ -9,9 +9,8 @@ from pathlib import Path
 import sys
 import pandas as pd
 import numpy as np
-import plotly.graph_objects as go
-import plotly.express as px
 from datetime import timedelta
+from sqlalchemy import func, select
 
 # Aggiungi src al path
 project_root = Path(__file__).parent.parent.parent
@@ -22,7 +21,11 @@ sys.path.insert(0, str(project_root / 'app'))
 # Import dal progetto
 from src.database.models import Stock, Dividend, PriceData
 from src.utils import get_database_session, get_logger, OperationLogger
-from src.utils.database import get_price_dataframe
+from src.utils import get_price_dataframe
+from strategies import (
+    dividend_window_metrics, DIVIDEND_METRIC_COLUMNS,
+    rolling_min, rolling_max, rolling_mean
+)
 from config import get_config
 from auth import require_authentication
 
@@ -41,94 +44,124 @@ def get_session():
     """Restituisce una nuova sessione DB (non cached)."""
     return get_database_session()
 
-def safe_pct(a, b):
-    """Percentuale sicura: (a - b) / b, gestisce divisione per zero."""
-    try:
-        return (a - b) / b
-    except Exception:
-        return np.nan
-
-def rolling_trend(series):
-    """Semplice pendenza lineare su una serie (regressione OLS su index)."""
-    if series.dropna().shape[0] < 2:
-        return np.nan
-    x = np.arange(len(series))
-    y = series.values
-    # rimuovi NaN
-    mask = ~np.isnan(y)
-    if mask.sum() < 2:
-        return np.nan
-    x = x[mask]
-    y = y[mask]
-    A = np.vstack([x, np.ones(len(x))]).T
-    m, _ = np.linalg.lstsq(A, y, rcond=None)[0]
-    return m
-
-def compute_technical_indicators(df):
-    """Calcola RSI e Stocastico semplici su DataFrame con colonne 'close' e 'high'/'low'."""
-    out = {}
-    close = df['close']
+def compute_indicator_series(df):
+    """
+    RSI (14) e Stocastico %K (14) sull'intera serie, calcolati una volta:
+    il valore a D-1 di ogni dividendo si legge poi per posizione.
+    Restituisce due array allineati alle righe di df.
+    """
+    close = df['close'].to_numpy(dtype=float)
     # RSI (14)
-    delta = close.diff()
-    up = delta.clip(lower=0).rolling(14).mean()
-    down = -delta.clip(upper=0).rolling(14).mean()
-    rs = up / down
-    rsi = 100 - (100 / (1 + rs))
-    out['rsi_d1'] = float(rsi.iloc[-1]) if not rsi.iloc[-1:].isna().all() else np.nan
+    delta = np.diff(close, prepend=np.nan)
+    up = rolling_mean(np.where(delta < 0, 0.0, delta), 14)
+    down = rolling_mean(np.where(delta > 0, 0.0, -delta), 14)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rs = up / down
+        rsi = 100 - (100 / (1 + rs))
 
     # Stocastico %K (14,3)
-    low14 = df['low'].rolling(14).min()
-    high14 = df['high'].rolling(14).max()
-    stoch_k = 100 * (close - low14) / (high14 - low14)
-    out['stoch_k_d1'] = float(stoch_k.iloc[-1]) if not stoch_k.iloc[-1:].isna().all() else np.nan
+    low14 = rolling_min(df['low'].to_numpy(dtype=float), 14)
+    high14 = rolling_max(df['high'].to_numpy(dtype=float), 14)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        stoch_k = 100 * (close - low14) / (high14 - low14)
 
-    return out
+    return rsi, stoch_k
 
 # ---------------------------------------------------------------------
 # ESTRAZIONE DATI E PREPARAZIONE
 # ---------------------------------------------------------------------
 @st.cache_data(ttl=300)
 def load_stocks():
-    """Carica lista titoli (cached per 5 minuti)."""
+    """
+    Carica lista titoli con almeno un dividendo (cached per 5 minuti).
+    Righe (id, ticker, name, n_div) senza oggetti ORM: il conteggio dividendi
+    arriva dalla stessa query (outer join + group by), i titoli senza
+    dividendi sono esclusi a monte.
+    """
     session = get_session()
     try:
-        return session.query(Stock).all()
+        n_div = func.count(Dividend.id).label('n_div')
+        stmt = (
+            select(Stock.id, Stock.ticker, Stock.name, n_div)
+            .outerjoin(Dividend, Dividend.stock_id == Stock.id)
+            .group_by(Stock.id)
+            .having(n_div > 0)
+        )
+        return session.execute(stmt).all()
     finally:
         session.close()
 
+@st.cache_data(ttl=600)
 def load_dividends_for_stock(stock_id):
-    """Carica dividendi ordinati per data."""
+    """
+    Carica dividendi ordinati per data (cached per 10 minuti).
+    Righe (id, ex_date, amount) senza oggetti ORM.
+    """
     session = get_session()
     try:
-        return session.query(Dividend).filter_by(stock_id=stock_id).order_by(Dividend.ex_date).all()
+        stmt = (
+            select(Dividend.id, Dividend.ex_date, Dividend.amount)
+            .filter_by(stock_id=stock_id)
+            .order_by(Dividend.ex_date)
+        )
+        return session.execute(stmt).all()
     finally:
         session.close()
 
-def load_price_window(stock_id, start_date, end_date):
-    """
-    Carica OHLCV tra start_date e end_date usando la funzione esistente.
-    Restituisce DataFrame con index=date.
-    """
+@st.cache_data(ttl=600)
+def _load_prices_cached(stock_id, start_iso, end_iso):
+    """OHLCV per (titolo, intervallo ISO): chiave hashabile a granularità giorno."""
     session = get_session()
     try:
-        df = get_price_dataframe(
-            session,
-            stock_id,
-            start_date=start_date.strftime('%Y-%m-%d'),
-            end_date=end_date.strftime('%Y-%m-%d')
-        )
+        df = get_price_dataframe(session, stock_id, start_date=start_iso, end_date=end_iso)
         if df is None:
             return pd.DataFrame()
         return df
     finally:
         session.close()
 
+def load_price_window(stock_id, start_date, end_date):
+    """
+    Carica OHLCV tra start_date e end_date usando la funzione esistente.
+    Restituisce DataFrame con index=date (cached per 10 minuti).
+    """
+    return _load_prices_cached(stock_id, start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d'))
+
+# Storico extra prima della prima finestra: RSI e Stocastico (14) a D-1 del
+# dividendo più vecchio hanno bisogno di almeno 15 barre (30 giorni ≈ 20 barre)
+INDICATOR_WARMUP_DAYS = 30
+
+def load_price_window_bulk(stock_id, ex_dates, pre_window=10, post_window=45):
+    """
+    Carica in una sola query i prezzi che coprono le finestre di tutti i dividendi
+    (dal primo ex_date - pre_window - INDICATOR_WARMUP_DAYS all'ultimo
+    ex_date + post_window). Le finestre per dividendo si ottengono poi per
+    slicing in memoria; il warm-up serve solo alle serie degli indicatori.
+    """
+    if not ex_dates:
+        return pd.DataFrame()
+    prices = load_price_window(
+        stock_id,
+        min(ex_dates) - timedelta(days=pre_window + INDICATOR_WARMUP_DAYS),
+        max(ex_dates) + timedelta(days=post_window)
+    )
+    return prices.sort_index()
+
 # ---------------------------------------------------------------------
-# METRICHE PER OGNI DIVIDENDO
+# METRICHE PER TUTTI I DIVIDENDI
 # ---------------------------------------------------------------------
-def compute_metrics_for_dividend(stock, dividend, pre_window=10, post_window=45):
+# Colonne di metrics_df, nell'ordine mostrato nei dettagli
+METRIC_COLUMNS = [
+    'ex_date', 'dividend', 'p_d1', 'p_d0', 'gap_pct',
+    'recovery_d5_pct', 'recovery_d10_pct', 'recovery_d15_pct', 'recovery_d30_pct',
+    'days_to_50pct_gap', 'trend_pre', 'vol_pre', 'volume_mean_pre',
+    'rsi_d1', 'stoch_k_d1', 'min_within_d3_flag'
+]
+
+@st.cache_data(ttl=3600)
+def compute_all_metrics(stock_id, ticker, div_key, pre_window=10, post_window=45):
     """
-    Calcola metriche per un singolo dividendo:
+    Metriche per tutti i dividendi del titolo, ordinate per ex_date:
     - gap %
     - recovery a D+5, D+10, D+15, D+30
     - giorni per recuperare 50% gap
@@ -137,118 +170,62 @@ def compute_metrics_for_dividend(stock, dividend, pre_window=10, post_window=45)
     - volume medio pre
     - RSI e Stocastico a D-1
     - minimo entro D+3 (boolean)
-    """
-    ex_date = dividend.ex_date
-    d_minus_1 = ex_date - timedelta(days=1)
-    start_pre = ex_date - timedelta(days=pre_window)
-    end_post = ex_date + timedelta(days=post_window)
 
-    # Carica finestra prezzi
+    Le metriche numeriche arrivano da un unico kernel (numba se disponibile)
+    su array NumPy; RSI/Stocastico sono calcolati una volta sull'intera serie.
+
+    Cache su (stock_id, div_key, finestre) con div_key = tuple di (ex_date, amount):
+    argomenti hashabili, quindi il risultato sopravvive al refresh del browser
+    ed è condiviso tra utenti.
+    """
+    ex_dates = [ex_date for ex_date, _ in div_key]
     try:
-        prices = load_price_window(stock.id, start_pre, end_post)
+        prices_all = load_price_window_bulk(stock_id, ex_dates, pre_window, post_window)
     except Exception as e:
-        logger.error(f"Errore caricamento prezzi per {stock.ticker} {ex_date}: {e}")
-        return None
+        logger.error(f"Errore caricamento prezzi per {ticker}: {e}")
+        return pd.DataFrame()
 
-    if prices.empty:
-        logger.warning(f"Nessun dato prezzo per {stock.ticker} nel periodo {start_pre} → {end_post} (dividendo {ex_date})")
-        return None
+    if prices_all.empty:
+        logger.warning(f"Nessun dato prezzo per {ticker} nel periodo dei dividendi")
+        return pd.DataFrame()
 
-    # Assicuriamoci che le date siano DatetimeIndex e ordinate
-    prices = prices.sort_index()
+    date_ords = prices_all.index.values.astype('datetime64[D]').astype(np.int64)
+    closes = np.ascontiguousarray(prices_all['close'].to_numpy(dtype=np.float64))
+    volumes = np.ascontiguousarray(prices_all['volume'].to_numpy(dtype=np.float64))
+    ex_ords = np.array([np.datetime64(d, 'D') for d in ex_dates]).astype(np.int64)
 
-    # Prezzi di riferimento
-    try:
-        p_d1 = float(prices.loc[d_minus_1]['close'])
-    except Exception:
-        # Se manca D-1, prendi il valore più vicino precedente
-        try:
-            p_d1 = float(prices[prices.index < ex_date]['close'].iloc[-1])
-        except Exception:
-            return None
+    metrics_df = pd.DataFrame(
+        dividend_window_metrics(date_ords, closes, volumes, ex_ords, pre_window, post_window),
+        columns=list(DIVIDEND_METRIC_COLUMNS)
+    )
+    metrics_df['ex_date'] = ex_dates
+    metrics_df['dividend'] = [float(amount) for _, amount in div_key]
+
+    # Dividendi senza D-1 o D0 nella finestra: esclusi
+    valid = metrics_df['valid'].to_numpy() == 1.0
+    if not valid.all():
+        logger.warning(f"{int((~valid).sum())} dividendi di {ticker} senza prezzi D-1/D0 nella finestra")
+    metrics_df = metrics_df[valid]
+    if metrics_df.empty:
+        return pd.DataFrame()
 
-    try:
-        p_d0 = float(prices.loc[ex_date]['close'])
-    except Exception:
-        # Se manca D0, prendi il primo valore >= ex_date
-        try:
-            p_d0 = float(prices[prices.index >= ex_date]['close'].iloc[0])
-        except Exception:
-            return None
-
-    gap_pct = safe_pct(p_d1, p_d0) * -1  # definisco gap come perdita
-
-    # Recovery: (P_{D+n} - P_D0) / P_{D-1}
-    def recovery_at(n):
-        target_date = ex_date + timedelta(days=n)
-        subset = prices[prices.index >= target_date]
-        if subset.empty:
-            return np.nan
-        p_dn = float(subset['close'].iloc[0])
-        return safe_pct(p_dn, p_d1)
-
-    rec_d5 = recovery_at(5)
-    rec_d10 = recovery_at(10)
-    rec_d15 = recovery_at(15)
-    rec_d30 = recovery_at(30)
-
-    # Giorni per recuperare 50% del gap
-    half_target_price = p_d0 + 0.5 * (p_d1 - p_d0)
-    days_to_50 = np.nan
-    post_prices = prices[prices.index >= ex_date]
-    for i, (dt, row) in enumerate(post_prices.iterrows()):
-        if row['close'] >= half_target_price:
-            days_to_50 = (dt - ex_date).days
-            break
-
-    # Trend pre
-    pre_prices = prices[(prices.index >= start_pre) & (prices.index < ex_date)]['close']
-    trend_pre = rolling_trend(pre_prices)
-
-    # Volatilità pre (std dei rendimenti)
-    pre_returns = pre_prices.pct_change().dropna()
-    vol_pre = float(pre_returns.std()) if not pre_returns.empty else np.nan
-
-    # Volume medio pre
-    vol_mean_pre = float(prices[(prices.index >= start_pre) & (prices.index < ex_date)]['volume'].mean())
-
-    # Indicatori tecnici a D-1
-    tech = compute_technical_indicators(prices[(prices.index >= start_pre) & (prices.index <= d_minus_1)])
-
-    # Minimo entro D+3
-    min_within_3 = np.nan
-    subset_3 = prices[(prices.index > ex_date) & (prices.index <= ex_date + timedelta(days=3))]
-    if not subset_3.empty:
-        min_within_3 = float(subset_3['close'].min())
-
-    min_within_3_flag = False
-    if not np.isnan(min_within_3):
-        min_within_3_flag = min_within_3 < p_d0
-
-    metrics = {
-        'ex_date': ex_date,
-        'dividend': float(dividend.amount) if hasattr(dividend, 'amount') else np.nan,
-        'p_d1': p_d1,
-        'p_d0': p_d0,
-        'gap_pct': gap_pct * 100,
-        'recovery_d5_pct': rec_d5 * 100 if not np.isnan(rec_d5) else np.nan,
-        'recovery_d10_pct': rec_d10 * 100 if not np.isnan(rec_d10) else np.nan,
-        'recovery_d15_pct': rec_d15 * 100 if not np.isnan(rec_d15) else np.nan,
-        'recovery_d30_pct': rec_d30 * 100 if not np.isnan(rec_d30) else np.nan,
-        'days_to_50pct_gap': days_to_50,
-        'trend_pre': trend_pre,
-        'vol_pre': vol_pre,
-        'volume_mean_pre': vol_mean_pre,
-        'rsi_d1': tech.get('rsi_d1', np.nan),
-        'stoch_k_d1': tech.get('stoch_k_d1', np.nan),
-        'min_within_d3_flag': min_within_3_flag
-    }
+    # Indicatori tecnici a D-1: serie intere calcolate una volta, lette per posizione
+    rsi, stoch_k = compute_indicator_series(prices_all)
+    i_d1 = metrics_df['i_d0'].to_numpy(dtype=np.int64) - 1
+    metrics_df['rsi_d1'] = rsi[i_d1]
+    metrics_df['stoch_k_d1'] = stoch_k[i_d1]
+    metrics_df['min_within_d3_flag'] = metrics_df['min_within_d3_flag'] == 1.0
 
-    return metrics
+    # Ordina per ex_date; l'indice è ex_date (colonna mantenuta) per il lookup
+    # del dividendo selezionato per chiave invece che con una maschera booleana
+    metrics_df = metrics_df[METRIC_COLUMNS].sort_values('ex_date')
+    metrics_df.index = pd.Index(metrics_df['ex_date'].tolist())
+    return metrics_df
 
 # ---------------------------------------------------------------------
 # STATISTICHE DI AFFIDABILITÀ
 # ---------------------------------------------------------------------
+@st.cache_data(show_spinner=False)
 def compute_reliability_stats(metrics_df, last_n=5):
     """
     Calcola percentuali di affidabilità su comportamenti:
@@ -261,95 +238,88 @@ def compute_reliability_stats(metrics_df, last_n=5):
     if metrics_df.empty:
         return pd.DataFrame(columns=['behavior', 'storico_pct', 'recent_pct'])
 
-    df = metrics_df.copy()
-
-    # Comportamenti booleani
-    df['rec50_d10'] = df['recovery_d10_pct'] >= (0.5 * df['gap_pct'] * -1)
-    df['rec100_d30'] = df['recovery_d30_pct'] >= (-df['gap_pct'])
-    df['trend_up_pre'] = df['trend_pre'] > 0
-    df['min_within_d3'] = df['min_within_d3_flag'] == True
-
-    # Volume in aumento: confronta volume_mean_pre con mediana storica
-    vol_median = df['volume_mean_pre'].median()
-    df['vol_increase_pre'] = df['volume_mean_pre'] > vol_median
-
-    behaviors = {
-        'Recupera 50% gap entro 10 giorni': 'rec50_d10',
-        'Recupera 100% gap entro 30 giorni': 'rec100_d30',
-        'Sale nei 10 giorni prima': 'trend_up_pre',
-        'Fa minimo entro D+3': 'min_within_d3',
-        'Volume in aumento pre-div': 'vol_increase_pre'
-    }
-
-    results = []
-    total = len(df)
-    recent_df = df.tail(last_n) if last_n > 0 else df
+    gap = metrics_df['gap_pct'].to_numpy(dtype=float)
+    volume_pre = metrics_df['volume_mean_pre'].to_numpy(dtype=float)
+
+    # Matrice (dividendi x comportamenti), colonne nell'ordine di behaviors;
+    # volume in aumento = volume_mean_pre sopra la mediana storica
+    behaviors = [
+        'Recupera 50% gap entro 10 giorni',
+        'Recupera 100% gap entro 30 giorni',
+        'Sale nei 10 giorni prima',
+        'Fa minimo entro D+3',
+        'Volume in aumento pre-div'
+    ]
+    with np.errstate(invalid='ignore'):
+        flags = np.column_stack([
+            metrics_df['recovery_d10_pct'].to_numpy(dtype=float) >= (0.5 * gap * -1),
+            metrics_df['recovery_d30_pct'].to_numpy(dtype=float) >= -gap,
+            metrics_df['trend_pre'].to_numpy(dtype=float) > 0,
+            metrics_df['min_within_d3_flag'].to_numpy() == True,
+            volume_pre > np.nanmedian(volume_pre)
+        ])
 
-    for label, col in behaviors.items():
-        storico_pct = 100.0 * df[col].sum() / total if total > 0 else np.nan
-        recent_pct = 100.0 * recent_df[col].sum() / len(recent_df) if len(recent_df) > 0 else np.nan
-        results.append({'behavior': label, 'storico_pct': storico_pct, 'recent_pct': recent_pct})
+    recent = flags[-last_n:] if last_n > 0 else flags
 
-    return pd.DataFrame(results)
+    return pd.DataFrame({
+        'behavior': behaviors,
+        'storico_pct': 100.0 * flags.mean(axis=0),
+        'recent_pct': 100.0 * recent.mean(axis=0)
+    })
 
 # ---------------------------------------------------------------------
 # CURVA MEDIA NORMALIZZATA
 # ---------------------------------------------------------------------
-def build_normalized_curves(stock, dividends, pre_window=10, post_window=45):
+@st.cache_data(ttl=3600)
+def build_normalized_curves(stock_id, ex_dates, pre_window=10, post_window=45):
     """
     Costruisce una matrice con prezzi normalizzati rispetto a P_{D-1}.
     Restituisce: index_days, curves dict con mean, median, pct25, pct75
+
+    Cache su (stock_id, tuple di ex_date, finestre).
     """
-    windows = []
     index_days = np.arange(-pre_window, post_window + 1)
 
-    for div in dividends:
-        ex_date = div.ex_date
-        start = ex_date - timedelta(days=pre_window)
-        end = ex_date + timedelta(days=post_window)
-
-        try:
-            prices = load_price_window(stock.id, start, end)
-        except Exception:
-            continue
-
-        if prices.empty:
-            continue
-
-        prices = prices.sort_index()
-
-        # estrai close aligned to index_days
-        series = []
-        for d in index_days:
-            target = ex_date + timedelta(days=int(d))
-            subset = prices[prices.index >= target]
-            if subset.empty:
-                series.append(np.nan)
-            else:
-                series.append(float(subset['close'].iloc[0]))
-
-        series = np.array(series, dtype=float)
-
-        # normalizza rispetto a P_{D-1}
-        try:
-            p_d1 = float(prices[prices.index < ex_date]['close'].iloc[-1])
-        except Exception:
-            continue
-
-        if np.isnan(p_d1) or p_d1 == 0:
-            continue
+    # Una sola query per tutti i dividendi, poi slicing in memoria
+    try:
+        prices_all = load_price_window_bulk(stock_id, ex_dates, pre_window, post_window)
+    except Exception:
+        return index_days, None
 
-        norm = (series - p_d1) / p_d1 * 100
-        windows.append(norm)
+    if prices_all.empty:
+        return index_days, None
 
-    if len(windows) == 0:
+    dates = prices_all.index
+    date_values = dates.values
+    closes = prices_all['close'].to_numpy(dtype=float)
+    n = len(closes)
+
+    ex = np.array([np.datetime64(pd.Timestamp(d)) for d in ex_dates])
+    start = ex - np.timedelta64(pre_window, 'D')
+    end = ex + np.timedelta64(post_window, 'D')
+
+    # Matrice (dividendi x giorni): primo close >= ex_date + d, con un'unica
+    # ricerca binaria su tutti i target; fuori dalla finestra [start, end] -> NaN
+    targets = ex[:, None] + index_days.astype('timedelta64[D]')[None, :]
+    pos = dates.searchsorted(targets.ravel(), side='left').reshape(targets.shape)
+    safe = np.minimum(pos, n - 1)
+    valid = (pos < n) & (date_values[safe] <= end[:, None])
+    matrix = np.where(valid, closes[safe], np.nan)
+
+    # P_{D-1}: ultimo close prima di ex_date, purché dentro la finestra
+    i0 = dates.searchsorted(ex, side='left')
+    prev = np.maximum(i0 - 1, 0)
+    p_d1 = np.where((i0 > 0) & (date_values[prev] >= start), closes[prev], np.nan)
+
+    keep = ~np.isnan(p_d1) & (p_d1 != 0)
+    if not keep.any():
         return index_days, None
 
-    arr = np.vstack(windows)
+    # normalizza rispetto a P_{D-1}
+    arr = (matrix[keep] - p_d1[keep, None]) / p_d1[keep, None] * 100
     mean_curve = np.nanmean(arr, axis=0)
-    median_curve = np.nanmedian(arr, axis=0)
-    pct25 = np.nanpercentile(arr, 25, axis=0)
-    pct75 = np.nanpercentile(arr, 75, axis=0)
+    # 25°, 50° e 75° percentile in un'unica chiamata (un solo ordinamento parziale)
+    pct25, median_curve, pct75 = np.nanquantile(arr, [0.25, 0.5, 0.75], axis=0)
 
     return index_days, {
         'mean': mean_curve,
@@ -361,15 +331,41 @@ def build_normalized_curves(stock, dividends, pre_window=10, post_window=45):
 # ---------------------------------------------------------------------
 # GRAFICI
 # ---------------------------------------------------------------------
-def plot_prepost_candles(prices, ex_date, pre_window=10, post_window=45):
-    """Crea un grafico candlestick + volume per la finestra."""
+def vertical_markers(markers):
+    """
+    Linee verticali etichettate come liste shapes/annotations, da passare
+    in un solo update_layout (invece di un add_vline per linea).
+    markers: lista di (x, colore, dash, testo).
+    """
+    shapes = [
+        dict(type='line', x0=x, x1=x, xref='x', y0=0, y1=1, yref='paper',
+             line=dict(color=color, dash=dash))
+        for x, color, dash, _ in markers
+    ]
+    annotations = [
+        dict(x=x, xref='x', y=1, yref='paper', text=text, showarrow=False,
+             xanchor='right', yanchor='top')
+        for x, _, _, text in markers
+    ]
+    return shapes, annotations
+
+@st.cache_data(show_spinner=False, max_entries=64, ttl=600)
+def build_prepost_figure(stock_id, ex_date, pre_window, post_window, _prices):
+    """
+    Figura candlestick + volume per la finestra (None se non ci sono prezzi).
+
+    Cache su (stock_id, ex_date, finestre): _prices è escluso dall'hashing,
+    tornare su un dividendo già visto non ricostruisce la figura. Stesso ttl
+    del loader dei prezzi, così dopo un aggiornamento del DB la figura scade.
+    """
+    import plotly.graph_objects as go  # import lazy: plotly serve solo dopo il calcolo
+
     start = ex_date - timedelta(days=pre_window)
     end = ex_date + timedelta(days=post_window)
-    window = prices[(prices.index >= start) & (prices.index <= end)].copy()
+    window = _prices.loc[pd.Timestamp(start):pd.Timestamp(end)]  # slice per ricerca binaria
 
     if window.empty:
-        st.warning("Dati prezzi insufficienti per il grafico.")
-        return
+        return None
 
     fig = go.Figure()
     fig.add_trace(go.Candlestick(
@@ -381,18 +377,29 @@ def plot_prepost_candles(prices, ex_date, pre_window=10, post_window=45):
         name='Prezzo'
     ))
 
-    # Volume come barre secondarie
-    fig.add_trace(go.Bar(
+    # Volume come area sull'asse secondario, renderizzata in WebGL
+    fig.add_trace(go.Scattergl(
         x=window.index,
         y=window['volume'],
         name='Volume',
-        marker_color='lightgrey',
+        mode='lines',
+        fill='tozeroy',
+        line=dict(color='lightgrey'),
         yaxis='y2',
         opacity=0.5
     ))
 
+    # Linee verticali D-DAY e limiti finestra
+    shapes, annotations = vertical_markers([
+        (ex_date, 'red', 'dash', 'D-DAY'),
+        (start, 'blue', 'dot', f'D-{pre_window}'),
+        (end, 'green', 'dot', f'D+{post_window}'),
+    ])
+
     # Layout con secondo asse per volume
     fig.update_layout(
+        shapes=shapes,
+        annotations=annotations,
         xaxis_rangeslider_visible=False,
         yaxis_title='Prezzo',
         yaxis2=dict(
@@ -402,33 +409,26 @@ def plot_prepost_candles(prices, ex_date, pre_window=10, post_window=45):
             showgrid=False,
             position=0.15
         ),
-        height=500
+        height=500,
+        uirevision='keep'  # zoom/pan preservati tra i rerun
     )
 
-    # Linee verticali
-    fig.add_vline(
-        x=ex_date,
-        line=dict(color='red', dash='dash'),
-        annotation_text='D-DAY',
-        annotation_position='top left'
-    )
-    fig.add_vline(
-        x=ex_date - timedelta(days=pre_window),
-        line=dict(color='blue', dash='dot'),
-        annotation_text=f'D-{pre_window}',
-        annotation_position='top left'
-    )
-    fig.add_vline(
-        x=ex_date + timedelta(days=post_window),
-        line=dict(color='green', dash='dot'),
-        annotation_text=f'D+{post_window}',
-        annotation_position='top left'
-    )
+    return fig
+
+def plot_prepost_candles(prices, ex_date, stock_id, pre_window=10, post_window=45):
+    """Crea un grafico candlestick + volume per la finestra."""
+    fig = build_prepost_figure(stock_id, ex_date, pre_window, post_window, prices)
+
+    if fig is None:
+        st.warning("Dati prezzi insufficienti per il grafico.")
+        return
 
     st.plotly_chart(fig, use_container_width=True)
 
 def plot_mean_normalized(index_days, curves):
     """Grafico della curva media normalizzata con area percentili."""
+    import plotly.graph_objects as go  # import lazy: plotly serve solo dopo il calcolo
+
     if curves is None:
         st.info("Dati insufficienti per costruire la curva media normalizzata.")
         return
@@ -461,14 +461,11 @@ def plot_mean_normalized(index_days, curves):
         name='25-75 percentile'
     ))
 
-    fig.add_vline(
-        x=0,
-        line=dict(color='red', dash='dash'),
-        annotation_text='D-DAY',
-        annotation_position='top left'
-    )
+    shapes, annotations = vertical_markers([(0, 'red', 'dash', 'D-DAY')])
 
     fig.update_layout(
+        shapes=shapes,
+        annotations=annotations,
         title='Curva media normalizzata attorno ai dividendi (% vs P_{D-1})',
         xaxis_title='Giorni relativi al dividendo (D)',
         yaxis_title='% rispetto a P_{D-1}',
@@ -477,6 +474,184 @@ def plot_mean_normalized(index_days, curves):
 
     st.plotly_chart(fig, use_container_width=True)
 
+# ---------------------------------------------------------------------
+# RENDER DELLE TAB
+# ---------------------------------------------------------------------
+def render_tab_chart(prices_full, ex_date, stock_id):
+    """Tab 1: grafico candlestick pre/post del dividendo selezionato."""
+    st.header("Grafico Pre/Post Dividendo (D-10 → D+45)")
+    if not prices_full.empty:
+        plot_prepost_candles(prices_full, ex_date, stock_id, pre_window=10, post_window=45)
+    else:
+        st.info("Dati prezzi non disponibili per il grafico.")
+
+def render_tab_pre(row, r):
+    """Tab 2: metriche pre-dividendo del dividendo selezionato."""
+    st.header("Metriche Pre-Dividendo (dividendo selezionato)")
+    if row.empty:
+        st.info("Metriche non disponibili per il dividendo selezionato.")
+    else:
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric(
+                "Trend D-10 → D-1 (slope)",
+                f"{r['trend_pre']:.4f}" if not np.isnan(r['trend_pre']) else "N/A"
+            )
+            st.metric(
+                "Volatilità pre (std returns)",
+                f"{r['vol_pre']:.4f}" if not np.isnan(r['vol_pre']) else "N/A"
+            )
+        with col2:
+            st.metric(
+                "Volume medio pre",
+                f"{r['volume_mean_pre']:.0f}" if not np.isnan(r['volume_mean_pre']) else "N/A"
+            )
+            st.metric(
+                "RSI D-1",
+                f"{r['rsi_d1']:.2f}" if not np.isnan(r['rsi_d1']) else "N/A"
+            )
+        with col3:
+            st.metric(
+                "Stocastico %K D-1",
+                f"{r['stoch_k_d1']:.2f}" if not np.isnan(r['stoch_k_d1']) else "N/A"
+            )
+            st.metric(
+                "Gap % (D0 vs D-1)",
+                f"{r['gap_pct']:.2f}%" if not np.isnan(r['gap_pct']) else "N/A"
+            )
+
+        st.markdown("**Dettaglio**")
+        st.dataframe(row.T, use_container_width=True, height=200)
+
+def render_tab_post(row, r):
+    """Tab 3: metriche post-dividendo del dividendo selezionato."""
+    st.header("Metriche Post-Dividendo (dividendo selezionato)")
+    if row.empty:
+        st.info("Metriche non disponibili per il dividendo selezionato.")
+    else:
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric(
+                "Recovery D+5",
+                f"{r['recovery_d5_pct']:.2f}%" if not np.isnan(r['recovery_d5_pct']) else "N/A"
+            )
+            st.metric(
+                "Recovery D+10",
+                f"{r['recovery_d10_pct']:.2f}%" if not np.isnan(r['recovery_d10_pct']) else "N/A"
+            )
+        with col2:
+            st.metric(
+                "Recovery D+15",
+                f"{r['recovery_d15_pct']:.2f}%" if not np.isnan(r['recovery_d15_pct']) else "N/A"
+            )
+            st.metric(
+                "Recovery D+30",
+                f"{r['recovery_d30_pct']:.2f}%" if not np.isnan(r['recovery_d30_pct']) else "N/A"
+            )
+        with col3:
+            st.metric(
+                "Giorni per 50% gap",
+                f"{r['days_to_50pct_gap']:.1f}" if not np.isnan(r['days_to_50pct_gap']) else "N/A"
+            )
+            st.metric(
+                "Minimo entro D+3",
+                "Sì" if r['min_within_d3_flag'] else "No"
+            )
+
+        st.markdown("**Dettaglio**")
+        st.dataframe(row.T, use_container_width=True, height=200)
+
+def render_tab_stats(stats_df, last_n):
+    """Tab 4: tabella statistiche di affidabilità e sintesi."""
+    st.header("Statistiche di Affidabilità (Storico + Ultimi N)")
+    if stats_df.empty:
+        st.info("Nessuna statistica disponibile.")
+    else:
+        # Formattazione percentuali nel layer di display (colonne restano numeriche)
+        stats_df_display = stats_df.rename(columns={
+            'behavior': 'Comportamento',
+            'storico_pct': 'Storico',
+            'recent_pct': f'Ultimi {last_n}'
+        })
+        st.table(stats_df_display.style.format(
+            {'Storico': '{:.1f}%', f'Ultimi {last_n}': '{:.1f}%'},
+            na_rep='N/A'
+        ))
+
+        # Sintesi
+        st.markdown("### Sintesi")
+        rec50_row = stats_df[stats_df['behavior'] == 'Recupera 50% gap entro 10 giorni']
+        if not rec50_row.empty:
+            storico_val = rec50_row['storico_pct'].values[0]
+            recent_val = rec50_row['recent_pct'].values[0]
+            st.write(
+                f"**Recupero 50% entro 10 giorni** — Storico: **{storico_val:.1f}%**, "
+                f"Ultimi {last_n}: **{recent_val:.1f}%**"
+            )
+
+def render_tab_interpretation(metrics_df, stats_df, last_n):
+    """Tab 5: interpretazione testuale delle statistiche."""
+    st.header("Interpretazione Automatica")
+    if metrics_df.empty:
+        st.info("Nessuna metrica per interpretare.")
+    else:
+        lines = []
+
+        rec50 = stats_df[stats_df['behavior'] == 'Recupera 50% gap entro 10 giorni']
+        rec100 = stats_df[stats_df['behavior'] == 'Recupera 100% gap entro 30 giorni']
+        trend_up = stats_df[stats_df['behavior'] == 'Sale nei 10 giorni prima']
+
+        if not rec50.empty:
+            s = rec50['storico_pct'].values[0]
+            r = rec50['recent_pct'].values[0]
+            lines.append(
+                f"Storicamente il titolo recupera il 50% del gap entro 10 giorni nel **{s:.1f}%** "
+                f"dei casi; negli ultimi {last_n} dividendi questa percentuale è **{r:.1f}%**."
+            )
+        if not rec100.empty:
+            s = rec100['storico_pct'].values[0]
+            r = rec100['recent_pct'].values[0]
+            lines.append(
+                f"Storicamente il recupero completo entro 30 giorni avviene nel **{s:.1f}%** "
+                f"dei casi; ultimi {last_n}: **{r:.1f}%**."
+            )
+        if not trend_up.empty:
+            s = trend_up['storico_pct'].values[0]
+            r = trend_up['recent_pct'].values[0]
+            lines.append(
+                f"In {s:.1f}% dei casi il titolo mostrava trend positivo nei 10 giorni prima "
+                f"del dividendo; negli ultimi {last_n} questa percentuale è {r:.1f}%."
+            )
+
+        if len(lines) == 0:
+            st.info("Dati insufficienti per generare un'interpretazione automatica.")
+        else:
+            for p in lines:
+                st.markdown(f"- {p}")
+
+def render_tab_curves(index_days, curves):
+    """Tab 6: curva media normalizzata attorno ai dividendi (già calcolata)."""
+    st.header("Comportamento Medio Attorno ai Dividendi")
+    plot_mean_normalized(index_days, curves)
+
+    if curves is not None:
+        # Statistiche sintetiche
+        mean = curves['mean']
+        idx = {d: i for i, d in enumerate(index_days)}
+
+        def mean_at(day):
+            i = idx.get(day, None)
+            return mean[i] if i is not None else np.nan
+
+        rec5 = mean_at(5)
+        rec10 = mean_at(10)
+        rec30 = mean_at(30)
+
+        st.markdown("### Statistiche dalla curva media")
+        st.write(f"Recovery medio D+5: **{rec5:.2f}%**")
+        st.write(f"Recovery medio D+10: **{rec10:.2f}%**")
+        st.write(f"Recovery medio D+30: **{rec30:.2f}%**")
+
 # ---------------------------------------------------------------------
 # STREAMLIT UI
 # ---------------------------------------------------------------------
@@ -486,10 +661,10 @@ def main():
 
     stocks = load_stocks()
     if not stocks:
-        st.error("Nessun titolo disponibile nel database.")
+        st.error("Nessun titolo con dividendi disponibile nel database.")
         st.stop()
 
-    stock_options = {f"{s.ticker} - {s.name}": s for s in stocks}
+    stock_options = {f"{s.ticker} - {s.name} ({s.n_div} div)": s for s in stocks}
     selected = st.selectbox("Seleziona Titolo", list(stock_options.keys()))
     stock = stock_options[selected]
 
@@ -519,21 +694,22 @@ def main():
     )
     selected_dividend = div_map[selected_div_label]
 
+    # Chiavi hashabili per le cache di metriche e curve
+    div_key = tuple((d.ex_date, d.amount) for d in dividends)
+    ex_dates = tuple(ex_date for ex_date, _ in div_key)
+
     # Bottone per avviare calcoli
     if st.button("🔁 Calcola analisi"):
         with st.spinner("Calcolo metriche..."):
             try:
                 with OperationLogger(logger, "pattern_analysis_new", stock_ticker=stock.ticker):
-                    # Calcola metriche per tutti i dividendi
-                    metrics_list = []
+                    # Calcola metriche per tutti i dividendi (cached per titolo + dividendi)
                     total_divs = len(dividends)
-                    for i, d in enumerate(dividends, 1):
-                        m = compute_metrics_for_dividend(stock, d)
-                        if m:
-                            metrics_list.append(m)
+                    metrics_df = compute_all_metrics(stock.id, stock.ticker, div_key)
+                    # Curva media normalizzata calcolata qui, non a ogni rerun della tab
+                    build_normalized_curves(stock.id, ex_dates)
 
-                    st.info(f"✅ Calcolate metriche per {len(metrics_list)} dividendi su {total_divs} totali")
-                    metrics_df = pd.DataFrame(metrics_list)
+                    st.info(f"✅ Calcolate metriche per {len(metrics_df)} dividendi su {total_divs} totali")
                     if metrics_df.empty:
                         st.error("❌ Impossibile calcolare metriche: nessun dato di prezzo disponibile per i dividendi selezionati.")
                         st.warning(f"""
@@ -544,11 +720,9 @@ def main():
                         """)
                         st.stop()
 
-                    # Ordina per ex_date
-                    metrics_df = metrics_df.sort_values('ex_date').reset_index(drop=True)
-                    st.session_state['metrics_df'] = metrics_df
-                    st.session_state['stock'] = stock
-                    st.success("Metriche calcolate e salvate in sessione.")
+                    # In sessione solo il titolo analizzato: i risultati restano in st.cache_data
+                    st.session_state['pattern_stock_id'] = stock.id
+                    st.success("Metriche calcolate e salvate in cache.")
 
             except Exception as e:
                 st.error(f"Errore durante il calcolo: {e}")
@@ -557,10 +731,10 @@ def main():
                 st.code(traceback.format_exc())
                 st.stop()
 
-    # Se abbiamo metriche in session_state, mostriamo le tab
-    if 'metrics_df' in st.session_state:
-        metrics_df = st.session_state['metrics_df']
-        stock = st.session_state['stock']
+    # Titolo già analizzato in questa sessione: metriche rilette dalla cache
+    if st.session_state.get('pattern_stock_id') == stock.id:
+        metrics_df = compute_all_metrics(stock.id, stock.ticker, div_key)
+        index_days, curves = build_normalized_curves(stock.id, ex_dates)
 
         # Prepara dati per grafici
         try:
@@ -574,6 +748,16 @@ def main():
             st.error(f"Errore caricamento prezzi per grafico: {e}")
             prices_full = pd.DataFrame()
 
+        # Riga del dividendo selezionato: estratta una volta, usata da Tab 2 e Tab 3
+        if selected_dividend.ex_date in metrics_df.index:
+            row = metrics_df.loc[[selected_dividend.ex_date]]
+        else:
+            row = metrics_df.iloc[:0]
+        r = row.iloc[0] if not row.empty else None
+
+        # Statistiche di affidabilità: calcolate una volta, usate da Tab 4 e Tab 5
+        stats_df = compute_reliability_stats(metrics_df, last_n=last_n)
+
         tabs = st.tabs([
             "Grafico Pre/Post",
             "Metriche Pre-Dividendo",
@@ -585,193 +769,27 @@ def main():
 
         # TAB 1: Grafico Pre/Post
         with tabs[0]:
-            st.header("Grafico Pre/Post Dividendo (D-10 → D+45)")
-            if not prices_full.empty:
-                plot_prepost_candles(prices_full, ex_date, pre_window=10, post_window=45)
-            else:
-                st.info("Dati prezzi non disponibili per il grafico.")
+            render_tab_chart(prices_full, ex_date, stock.id)
 
         # TAB 2: Metriche Pre-Dividendo
         with tabs[1]:
-            st.header("Metriche Pre-Dividendo (dividendo selezionato)")
-            row = metrics_df[metrics_df['ex_date'] == selected_dividend.ex_date]
-            if row.empty:
-                st.info("Metriche non disponibili per il dividendo selezionato.")
-            else:
-                r = row.iloc[0]
-                col1, col2, col3 = st.columns(3)
-                with col1:
-                    st.metric(
-                        "Trend D-10 → D-1 (slope)",
-                        f"{r['trend_pre']:.4f}" if not np.isnan(r['trend_pre']) else "N/A"
-                    )
-                    st.metric(
-                        "Volatilità pre (std returns)",
-                        f"{r['vol_pre']:.4f}" if not np.isnan(r['vol_pre']) else "N/A"
-                    )
-                with col2:
-                    st.metric(
-                        "Volume medio pre",
-                        f"{r['volume_mean_pre']:.0f}" if not np.isnan(r['volume_mean_pre']) else "N/A"
-                    )
-                    st.metric(
-                        "RSI D-1",
-                        f"{r['rsi_d1']:.2f}" if not np.isnan(r['rsi_d1']) else "N/A"
-                    )
-                with col3:
-                    st.metric(
-                        "Stocastico %K D-1",
-                        f"{r['stoch_k_d1']:.2f}" if not np.isnan(r['stoch_k_d1']) else "N/A"
-                    )
-                    st.metric(
-                        "Gap % (D0 vs D-1)",
-                        f"{r['gap_pct']:.2f}%" if not np.isnan(r['gap_pct']) else "N/A"
-                    )
-
-                st.markdown("**Dettaglio**")
-                st.dataframe(row.T, use_container_width=True, height=200)
+            render_tab_pre(row, r)
 
         # TAB 3: Metriche Post-Dividendo
         with tabs[2]:
-            st.header("Metriche Post-Dividendo (dividendo selezionato)")
-            row = metrics_df[metrics_df['ex_date'] == selected_dividend.ex_date]
-            if row.empty:
-                st.info("Metriche non disponibili per il dividendo selezionato.")
-            else:
-                r = row.iloc[0]
-                col1, col2, col3 = st.columns(3)
-                with col1:
-                    st.metric(
-                        "Recovery D+5",
-                        f"{r['recovery_d5_pct']:.2f}%" if not np.isnan(r['recovery_d5_pct']) else "N/A"
-                    )
-                    st.metric(
-                        "Recovery D+10",
-                        f"{r['recovery_d10_pct']:.2f}%" if not np.isnan(r['recovery_d10_pct']) else "N/A"
-                    )
-                with col2:
-                    st.metric(
-                        "Recovery D+15",
-                        f"{r['recovery_d15_pct']:.2f}%" if not np.isnan(r['recovery_d15_pct']) else "N/A"
-                    )
-                    st.metric(
-                        "Recovery D+30",
-                        f"{r['recovery_d30_pct']:.2f}%" if not np.isnan(r['recovery_d30_pct']) else "N/A"
-                    )
-                with col3:
-                    st.metric(
-                        "Giorni per 50% gap",
-                        f"{r['days_to_50pct_gap']:.1f}" if not np.isnan(r['days_to_50pct_gap']) else "N/A"
-                    )
-                    st.metric(
-                        "Minimo entro D+3",
-                        "Sì" if r['min_within_d3_flag'] else "No"
-                    )
-
-                st.markdown("**Dettaglio**")
-                st.dataframe(row.T, use_container_width=True, height=200)
+            render_tab_post(row, r)
 
         # TAB 4: Statistiche di Affidabilità
         with tabs[3]:
-            st.header("Statistiche di Affidabilità (Storico + Ultimi N)")
-            stats_df = compute_reliability_stats(metrics_df, last_n=last_n)
-            if stats_df.empty:
-                st.info("Nessuna statistica disponibile.")
-            else:
-                # Formattazione percentuali
-                stats_df_display = stats_df.copy()
-                stats_df_display['storico_pct'] = stats_df_display['storico_pct'].apply(
-                    lambda x: f"{x:.1f}%" if not np.isnan(x) else "N/A"
-                )
-                stats_df_display['recent_pct'] = stats_df_display['recent_pct'].apply(
-                    lambda x: f"{x:.1f}%" if not np.isnan(x) else "N/A"
-                )
-                st.table(stats_df_display.rename(columns={
-                    'behavior': 'Comportamento',
-                    'storico_pct': 'Storico',
-                    'recent_pct': f'Ultimi {last_n}'
-                }))
-
-                # Sintesi
-                st.markdown("### Sintesi")
-                rec50_row = stats_df[stats_df['behavior'] == 'Recupera 50% gap entro 10 giorni']
-                if not rec50_row.empty:
-                    storico_val = rec50_row['storico_pct'].values[0]
-                    recent_val = rec50_row['recent_pct'].values[0]
-                    st.write(
-                        f"**Recupero 50% entro 10 giorni** — Storico: **{storico_val:.1f}%**, "
-                        f"Ultimi {last_n}: **{recent_val:.1f}%**"
-                    )
+            render_tab_stats(stats_df, last_n)
 
         # TAB 5: Interpretazione Automatica
         with tabs[4]:
-            st.header("Interpretazione Automatica")
-            if metrics_df.empty:
-                st.info("Nessuna metrica per interpretare.")
-            else:
-                stats_df = compute_reliability_stats(metrics_df, last_n=last_n)
-                lines = []
-
-                rec50 = stats_df[stats_df['behavior'] == 'Recupera 50% gap entro 10 giorni']
-                rec100 = stats_df[stats_df['behavior'] == 'Recupera 100% gap entro 30 giorni']
-                trend_up = stats_df[stats_df['behavior'] == 'Sale nei 10 giorni prima']
-
-                if not rec50.empty:
-                    s = rec50['storico_pct'].values[0]
-                    r = rec50['recent_pct'].values[0]
-                    lines.append(
-                        f"Storicamente il titolo recupera il 50% del gap entro 10 giorni nel **{s:.1f}%** "
-                        f"dei casi; negli ultimi {last_n} dividendi questa percentuale è **{r:.1f}%**."
-                    )
-                if not rec100.empty:
-                    s = rec100['storico_pct'].values[0]
-                    r = rec100['recent_pct'].values[0]
-                    lines.append(
-                        f"Storicamente il recupero completo entro 30 giorni avviene nel **{s:.1f}%** "
-                        f"dei casi; ultimi {last_n}: **{r:.1f}%**."
-                    )
-                if not trend_up.empty:
-                    s = trend_up['storico_pct'].values[0]
-                    r = trend_up['recent_pct'].values[0]
-                    lines.append(
-                        f"In {s:.1f}% dei casi il titolo mostrava trend positivo nei 10 giorni prima "
-                        f"del dividendo; negli ultimi {last_n} questa percentuale è {r:.1f}%."
-                    )
-
-                if len(lines) == 0:
-                    st.info("Dati insufficienti per generare un'interpretazione automatica.")
-                else:
-                    for p in lines:
-                        st.markdown(f"- {p}")
+            render_tab_interpretation(metrics_df, stats_df, last_n)
 
         # TAB 6: Comportamento Medio
         with tabs[5]:
-            st.header("Comportamento Medio Attorno ai Dividendi")
-            index_days, curves = build_normalized_curves(
-                stock,
-                dividends,
-                pre_window=10,
-                post_window=45
-            )
-            plot_mean_normalized(index_days, curves)
-
-            if curves is not None:
-                # Statistiche sintetiche
-                mean = curves['mean']
-                idx = {d: i for i, d in enumerate(index_days)}
-
-                def mean_at(day):
-                    i = idx.get(day, None)
-                    return mean[i] if i is not None else np.nan
-
-                rec5 = mean_at(5)
-                rec10 = mean_at(10)
-                rec30 = mean_at(30)
-
-                st.markdown("### Statistiche dalla curva media")
-                st.write(f"Recovery medio D+5: **{rec5:.2f}%**")
-                st.write(f"Recovery medio D+10: **{rec10:.2f}%**")
-                st.write(f"Recovery medio D+30: **{rec30:.2f}%**")
+            render_tab_curves(index_days, curves)
 
     else:
         st.info("Premi 'Calcola analisi' per generare le metriche e le statistiche del titolo selezionato.")
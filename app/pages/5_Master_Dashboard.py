@@ -13,7 +13,7 @@ import pandas as pd
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import streamlit as st
-from sqlalchemy import create_engine
+from sqlalchemy import String, func, select, type_coerce
 from sqlalchemy.orm import sessionmaker
 
 # =============================================================================
@@ -25,6 +25,8 @@ sys.path.insert(0, str(project_root / 'src'))
 sys.path.insert(0, str(project_root / 'app'))
 
 from database.models import Stock, Dividend, PriceData  # noqa: E402
+from database.engine import create_sqlite_engine  # noqa: E402
+from strategies import rsi_wilder, stochastic_oscillator  # noqa: E402
 from auth import require_authentication  # noqa: E402
 
 st.set_page_config(
@@ -46,79 +48,68 @@ def get_database_engine():
     current_file = Path(__file__).resolve()
     project_root = current_file.parent.parent.parent
     db_path = project_root / "data" / "dividend_recovery.db"
-    return create_engine(f"sqlite:///{db_path}", echo=False)
+    return create_sqlite_engine(db_path)
+
+
+@st.cache_resource
+def get_sessionmaker():
+    """Cache la factory delle sessioni: una sola classe Session per processo"""
+    return sessionmaker(bind=get_database_engine(), expire_on_commit=False)
 
 
 def get_session():
-    """Crea nuova sessione ogni volta"""
-    engine = get_database_engine()
-    Session = sessionmaker(bind=engine)
-    return Session()
+    """Crea nuova sessione ogni volta (dalla factory in cache)"""
+    return get_sessionmaker()()
 
 
 # =============================================================================
 # INDICATORI TECNICI
 # =============================================================================
 
-def calculate_stochastic(df: pd.DataFrame, k_period=14, d_period=3):
+def calculate_stochastic(low: np.ndarray, high: np.ndarray, close: np.ndarray, k_period=14, d_period=3):
     """
     Calcola Stocastico %K e %D
 
     %K = (Close - Lowest Low) / (Highest High - Lowest Low) * 100
     %D = SMA(%K, 3)
     """
-    df = df.copy()
-    df['lowest_low'] = df['low'].rolling(window=k_period).min()
-    df['highest_high'] = df['high'].rolling(window=k_period).max()
-    df['stoch_k'] = 100 * (df['close'] - df['lowest_low']) / (df['highest_high'] - df['lowest_low'])
-    df['stoch_d'] = df['stoch_k'].rolling(window=d_period).mean()
-    return df[['stoch_k', 'stoch_d']]
+    return stochastic_oscillator(low, high, close, k_period, d_period)
 
 
-def calculate_stochastic_rsi(df: pd.DataFrame, rsi_period=14, stoch_period=14, k_period=3, d_period=3):
+def calculate_stochastic_rsi(close: np.ndarray, rsi_period=14, stoch_period=14, k_period=3, d_period=3):
     """
     Calcola Stocastico RSI
 
     1. Calcola RSI
     2. Applica stocastico al RSI
     """
-    df = df.copy()
-
-    # RSI
-    delta = df['close'].diff()
-    gain = (delta.where(delta > 0, 0)).rolling(window=rsi_period).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(window=rsi_period).mean()
-    rs = gain / loss
-    df['rsi'] = 100 - (100 / (1 + rs))
+    # RSI con smoothing di Wilder (kernel a passata singola)
+    rsi = rsi_wilder(close, rsi_period)
 
-    # Stocastico su RSI
-    df['rsi_lowest'] = df['rsi'].rolling(window=stoch_period).min()
-    df['rsi_highest'] = df['rsi'].rolling(window=stoch_period).max()
-    df['stoch_rsi_k'] = 100 * (df['rsi'] - df['rsi_lowest']) / (df['rsi_highest'] - df['rsi_lowest'])
-    df['stoch_rsi_d'] = df['stoch_rsi_k'].rolling(window=d_period).mean()
+    # Stocastico su RSI: min/max/%K/%D nello stesso kernel
+    return stochastic_oscillator(rsi, rsi, rsi, stoch_period, d_period)
 
-    return df[['stoch_rsi_k', 'stoch_rsi_d']]
 
-
-@st.cache_data
 def calculate_all_indicators(df_prices: pd.DataFrame):
     """
-    Calcola tutti gli indicatori tecnici (con cache)
-    Performance: calcolo pesante fatto una volta sola
+    Calcola tutti gli indicatori tecnici
+    Performance: su array NumPy con i kernel condivisi (numba se disponibile);
+    la cache è in load_prices_with_indicators, una volta per titolo
     """
     if df_prices.empty:
         return None
 
-    df = df_prices.sort_values('date').reset_index(drop=True).copy()
+    # Unico frame di lavoro: sort_values restituisce già una copia, le colonne
+    # degli indicatori si aggiungono direttamente
+    df = df_prices.sort_values('date', ignore_index=True)
 
-    # Calcola indicatori
-    stoch = calculate_stochastic(df)
-    stoch_rsi = calculate_stochastic_rsi(df)
+    close = df['close'].to_numpy(dtype=float)
+    low = df['low'].to_numpy(dtype=float)
+    high = df['high'].to_numpy(dtype=float)
 
-    df['stoch_k'] = stoch['stoch_k']
-    df['stoch_d'] = stoch['stoch_d']
-    df['stoch_rsi_k'] = stoch_rsi['stoch_rsi_k']
-    df['stoch_rsi_d'] = stoch_rsi['stoch_rsi_d']
+    # Calcola indicatori
+    df['stoch_k'], df['stoch_d'] = calculate_stochastic(low, high, close)
+    df['stoch_rsi_k'], df['stoch_rsi_d'] = calculate_stochastic_rsi(close)
 
     return df
 
@@ -127,61 +118,150 @@ def calculate_all_indicators(df_prices: pd.DataFrame):
 # CARICAMENTO DATI
 # =============================================================================
 
-@st.cache_data
-def load_stock_data(stock_id: int):
+# Righe di prezzo lette per blocco: limita la memoria temporanea della lettura
+PRICE_CHUNK_ROWS = 5000
+
+
+@st.cache_data(max_entries=32)
+def load_prices(stock_id: int, start_date=None, end_date=None):
     """
-    Carica dati prezzi e dividendi con cache
+    Carica prezzi OHLCV con cache, opzionalmente solo tra start_date e end_date
+
+    Il filtro sulle date è nella WHERE (indice stock_id/date di SQLite): per un
+    intervallo ridotto non si leggono righe inutili. Ogni intervallo ha la sua
+    voce di cache (max 32: le voci più vecchie vengono scartate).
+    Query Core (select delle sole colonne) letta direttamente in pandas:
+    niente oggetti ORM da materializzare riga per riga.
+    OHLC in float32 e volume nel più piccolo intero senza segno: metà memoria
+    per gli indicatori, precisione ampiamente sufficiente per i prezzi.
+    La data arriva come testo ISO e pandas la converte in blocco in
+    datetime64 (formato esplicito), senza un oggetto date Python per riga
     """
-    session = get_session()
-
-    try:
-        prices = (
-            session.query(PriceData)
-            .filter_by(stock_id=stock_id)
-            .order_by(PriceData.date)
-            .all()
-        )
-        dividends = (
-            session.query(Dividend)
-            .filter_by(stock_id=stock_id)
-            .order_by(Dividend.ex_date)
-            .all()
+    stmt = (
+        select(type_coerce(PriceData.date, String).label('date'), PriceData.open,
+               PriceData.high, PriceData.low, PriceData.close, PriceData.volume)
+        .where(PriceData.stock_id == stock_id)
+        .order_by(PriceData.date)
+    )
+    if start_date is not None:
+        stmt = stmt.where(PriceData.date >= start_date)
+    if end_date is not None:
+        stmt = stmt.where(PriceData.date <= end_date)
+
+    with get_database_engine().connect() as conn:
+        # Lettura a blocchi (stream dei risultati): in memoria solo un blocco
+        # di righe Python alla volta, poi un unico concat
+        chunks = pd.read_sql_query(
+            stmt, conn,
+            dtype={'open': np.float32, 'high': np.float32, 'low': np.float32, 'close': np.float32},
+            parse_dates={'date': {'format': '%Y-%m-%d'}},
+            chunksize=PRICE_CHUNK_ROWS
         )
-    finally:
-        session.close()
-
-    df_prices = pd.DataFrame([
-        (p.date, p.open, p.high, p.low, p.close, p.volume)
-        for p in prices
-    ], columns=['date', 'open', 'high', 'low', 'close', 'volume'])
-
-    df_divs = pd.DataFrame([
-        (d.ex_date, d.amount)
-        for d in dividends
-    ], columns=['ex_date', 'amount'])
+        df_prices = pd.concat(chunks, ignore_index=True)
 
     # Pulizia con controlli robusti
     if not df_prices.empty:
         df_prices = df_prices.dropna(subset=['date', 'close'])
+        df_prices['volume'] = pd.to_numeric(df_prices['volume'], downcast='unsigned')
+
+    return df_prices
+
+
+@st.cache_data
+def load_dividends(stock_id: int):
+    """Carica tutti i dividendi del titolo (ordinati per ex_date) con cache"""
+    stmt = (
+        select(Dividend.ex_date, Dividend.amount)
+        .where(Dividend.stock_id == stock_id)
+        .order_by(Dividend.ex_date)
+    )
+
+    with get_database_engine().connect() as conn:
+        df_divs = pd.read_sql_query(stmt, conn, dtype={'amount': np.float64})
 
     if not df_divs.empty:
         df_divs = df_divs.dropna(subset=['ex_date', 'amount'])
 
-    return df_prices, df_divs
+    return df_divs
 
 
-def select_stock():
-    """Selezione titolo con gestione errori"""
+@st.cache_data
+def load_stock_bounds(stock_id: int):
+    """
+    Prima/ultima data prezzi e ultima chiusura del titolo (None se non ci sono prezzi)
+
+    Dimensiona lo slider del Frame 1 senza caricare tutto lo storico
+    """
+    with get_database_engine().connect() as conn:
+        min_date, max_date = conn.execute(
+            select(func.min(PriceData.date), func.max(PriceData.date))
+            .where(PriceData.stock_id == stock_id, PriceData.close.is_not(None))
+        ).one()
+        if min_date is None:
+            return None
+        last_close = conn.execute(
+            select(PriceData.close)
+            .where(PriceData.stock_id == stock_id, PriceData.date == max_date)
+        ).scalar()
+
+    return min_date, max_date, last_close
+
+
+def close_on_dates(dfp: pd.DataFrame, dates) -> np.ndarray:
+    """
+    Chiusura di dfp (ordinato per data) esattamente alle date richieste,
+    NaN dove non c'è un prezzo quel giorno (come un merge how='left')
+
+    Ricerca binaria sulle date già ordinate invece di una hash-join a ogni rerun
+    """
+    targets = np.asarray(list(dates), dtype='datetime64[D]')
+    closes = np.full(len(targets), np.nan)
+    if dfp.empty or len(targets) == 0:
+        return closes
+
+    price_dates = dfp['date'].to_numpy(dtype='datetime64[D]')
+    idx = np.minimum(np.searchsorted(price_dates, targets), len(price_dates) - 1)
+    found = price_dates[idx] == targets
+    closes[found] = dfp['close'].to_numpy(dtype=float)[idx[found]]
+    return closes
+
+
+def date_slice(df: pd.DataFrame, column: str, start, end) -> pd.DataFrame:
+    """
+    Righe di df (ordinato per column) con start <= column <= end
+
+    Due ricerche binarie e uno slice contiguo invece di due maschere booleane
+    sull'intera colonna
+    """
+    dates = df[column]
+    lo = dates.searchsorted(start, side='left')
+    hi = dates.searchsorted(end, side='right')
+    return df.iloc[lo:hi]
+
+
+@st.cache_data(ttl=300)
+def load_stocks():
+    """
+    Carica lista titoli (cached per 5 minuti)
+    Solo le colonne usate dalla pagina: righe (id, ticker, name, market)
+    senza oggetti ORM, con accesso per attributo come prima
+    """
     session = get_session()
+    try:
+        return session.execute(
+            select(Stock.id, Stock.ticker, Stock.name, Stock.market)
+        ).all()
+    finally:
+        session.close()
 
+
+def select_stock():
+    """Selezione titolo con gestione errori"""
     try:
-        stocks = session.query(Stock).all()
+        stocks = load_stocks()
     except Exception as e:
-        session.close()
         st.error(f"Errore nell'accesso al database: {e}")
         st.stop()
-    finally:
-        session.close()
 
     if not stocks:
         st.warning("⚠️ Nessun titolo nel database")
@@ -196,98 +276,69 @@ def select_stock():
 # FRAME 1: PREZZI & DIVIDENDI (Vista Rapida)
 # =============================================================================
 
-def render_frame_price_dividends(stock, df_prices, df_divs):
-    """
-    Frame 1: Vista rapida prezzi e dividendi
-    Focus: Overview veloce con filtro temporale
-    """
-    st.markdown("### 📉 Prezzi & Dividendi - Vista Rapida")
+# Oltre questo intervallo (giorni) il Frame 1 aggrega le candele per settimana
+WEEKLY_CANDLES_MIN_DAYS = 730
 
-    if df_prices.empty:
-        st.warning("⚠️ Nessun dato prezzi disponibile per questo titolo")
-        return
+# Oltre questo numero di punti gli scatter si disegnano in WebGL (Scattergl)
+WEBGL_MIN_POINTS = 1000
 
-    # Metriche base
-    col1, col2, col3, col4 = st.columns(4)
-    with col1:
-        st.metric("Ticker", stock.ticker)
-    with col2:
-        st.metric("Mercato", stock.market)
-    with col3:
-        st.metric("Prezzo Attuale", f"€{df_prices.iloc[-1]['close']:.2f}")
-    with col4:
-        st.metric("Dividendi Totali", len(df_divs))
 
-    # Filtro temporale
-    min_date = df_prices['date'].min()
-    max_date = df_prices['date'].max()
-
-    date_range = st.slider(
-        "Intervallo date",
-        min_value=min_date,
-        max_value=max_date,
-        value=(min_date, max_date),
-        format="YYYY-MM-DD",
-        key="frame1_date_range"
-    )
-
-    dfp = df_prices[
-        (df_prices['date'] >= date_range[0]) &
-        (df_prices['date'] <= date_range[1])
-    ].copy()
-
-    dfd = df_divs[
-        (df_divs['ex_date'] >= date_range[0]) &
-        (df_divs['ex_date'] <= date_range[1])
-    ].copy()
-
-    if dfp.empty:
-        st.warning("⚠️ Nessun dato nel range selezionato")
-        return
+@st.cache_data(show_spinner=False, max_entries=32)
+def build_price_dividends_figure(stock_id: int, ticker: str, date_range, _dfp: pd.DataFrame, _dfd: pd.DataFrame):
+    """
+    Grafico prezzi + marker dividendi del Frame 1
 
-    # Grafico semplice
+    Cache su (stock_id, ticker, date_range): _dfp/_dfd (già filtrati su
+    date_range) sono esclusi dall'hashing, la figura si ricostruisce solo
+    quando cambiano titolo o intervallo
+    """
     fig = go.Figure()
 
+    # Candlestick non ha una variante WebGL: oltre i 2 anni si disegnano
+    # candele settimanali invece di una candela SVG per giorno
+    candles = _dfp
+    candle_name = 'Prezzo'
+    if (_dfp['date'].iloc[-1] - _dfp['date'].iloc[0]).days > WEEKLY_CANDLES_MIN_DAYS:
+        candles = (
+            _dfp.set_index('date')
+            .resample('W')
+            .agg({'open': 'first', 'high': 'max', 'low': 'min', 'close': 'last'})
+            .dropna(subset=['close'])
+            .rename_axis('date')
+            .reset_index()
+        )
+        candle_name = 'Prezzo (settimanale)'
+
     fig.add_trace(go.Candlestick(
-        x=dfp['date'],
-        open=dfp['open'],
-        high=dfp['high'],
-        low=dfp['low'],
-        close=dfp['close'],
-        name='Prezzo',
+        x=candles['date'].to_numpy(),
+        open=candles['open'].to_numpy(dtype=np.float32),
+        high=candles['high'].to_numpy(dtype=np.float32),
+        low=candles['low'].to_numpy(dtype=np.float32),
+        close=candles['close'].to_numpy(dtype=np.float32),
+        name=candle_name,
         increasing_line_color='green',
         decreasing_line_color='red'
     ))
 
     # Dividendi con colori dinamici
-    if not dfd.empty:
-        dfd = dfd.merge(
-            dfp[['date', 'close']],
-            left_on='ex_date',
-            right_on='date',
-            how='left'
-        ).rename(columns={'close': 'price_on_ex'})
-
-        div_dates = []
-        div_prices = []
-        div_labels = []
-        div_colors = []
-
-        for _, div in dfd.iterrows():
-            if pd.isnull(div['price_on_ex']):
-                continue
-
-            div_dates.append(div['ex_date'])
-            div_prices.append(div['price_on_ex'] * 1.02)
-            label = f"€{div['amount']:.3f}"
-            div_labels.append(label)
-
-            # Colore dinamico basato su importo
-            intensity = int(min(div['amount'] * 400, 255)) if pd.notnull(div['amount']) else 100
-            div_colors.append(f"rgba(0, {intensity}, 0, 0.9)")
+    if not _dfd.empty:
+        dfd = _dfd.assign(price_on_ex=close_on_dates(_dfp, _dfd['ex_date']))
+
+        # Solo dividendi con prezzo all'ex-date, colonne estratte una volta
+        markers = dfd.dropna(subset=['price_on_ex'])
+        amounts = markers['amount'].to_numpy(dtype=float)
+
+        div_dates = markers['ex_date'].tolist()
+        div_prices = markers['price_on_ex'].to_numpy(dtype=float) * 1.02
+        div_labels = [f"€{a:.3f}" for a in amounts]
+
+        # Colore dinamico basato su importo
+        intensities = np.where(np.isnan(amounts), 100, np.minimum(amounts * 400, 255)).astype(int)
+        div_colors = [f"rgba(0, {i}, 0, 0.9)" for i in intensities]
 
         if div_dates:
-            fig.add_trace(go.Scatter(
+            scatter = go.Scattergl if len(div_dates) > WEBGL_MIN_POINTS else go.Scatter
+            fig.add_trace(scatter(
                 x=div_dates,
                 y=div_prices,
                 mode='markers+text',
@@ -300,7 +351,7 @@ def render_frame_price_dividends(stock, df_prices, df_divs):
             ))
 
     fig.update_layout(
-        title=f"{stock.ticker} - Prezzi e Dividendi",
+        title=f"{ticker} - Prezzi e Dividendi",
         xaxis_title="Data",
         yaxis_title="Prezzo (€)",
         height=500,
@@ -318,6 +369,55 @@ def render_frame_price_dividends(stock, df_prices, df_divs):
         )
     )
 
+    return fig
+
+
+def render_frame_price_dividends(stock, bounds, df_divs):
+    """
+    Frame 1: Vista rapida prezzi e dividendi
+    Focus: Overview veloce con filtro temporale
+    """
+    st.markdown("### 📉 Prezzi & Dividendi - Vista Rapida")
+
+    if bounds is None:
+        st.warning("⚠️ Nessun dato prezzi disponibile per questo titolo")
+        return
+
+    min_date, max_date, last_close = bounds
+
+    # Metriche base
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Ticker", stock.ticker)
+    with col2:
+        st.metric("Mercato", stock.market)
+    with col3:
+        st.metric("Prezzo Attuale", f"€{last_close:.2f}")
+    with col4:
+        st.metric("Dividendi Totali", len(df_divs))
+
+    # Filtro temporale
+    date_range = st.slider(
+        "Intervallo date",
+        min_value=min_date,
+        max_value=max_date,
+        value=(min_date, max_date),
+        format="YYYY-MM-DD",
+        key="frame1_date_range"
+    )
+
+    # Solo i prezzi dell'intervallo, filtrati in SQL
+    dfp = load_prices(stock.id, date_range[0], date_range[1])
+
+    # Dividendi già ordinati per ex_date (load_dividends)
+    dfd = date_slice(df_divs, 'ex_date', date_range[0], date_range[1])
+
+    if dfp.empty:
+        st.warning("⚠️ Nessun dato nel range selezionato")
+        return
+
+    # Grafico (cached per titolo + intervallo)
+    fig = build_price_dividends_figure(stock.id, stock.ticker, date_range, dfp, dfd)
     st.plotly_chart(fig, use_container_width=True)
 
     # Tabella dividendi compatta
@@ -337,7 +437,220 @@ def render_frame_price_dividends(stock, df_prices, df_divs):
 # FRAME 2: ANALISI TECNICA ATTORNO AL DIVIDENDO (D-10 → D+45)
 # =============================================================================
 
-def render_frame_dividend_focus(stock, df_prices, df_divs):
+@st.cache_data(show_spinner=False, max_entries=32)
+def build_dividend_focus_figure(stock_id: int, ticker: str, selected_date, days_before: int, days_after: int,
+                                price_ex, price_before, _dfp_ind: pd.DataFrame):
+    """
+    Subplot prezzo + volume + stocastici del Frame 2
+
+    Cache su (stock_id, ticker, dividendo, intervallo, prezzi chiave): _dfp_ind
+    (prezzi con indicatori per quell'intervallo) è escluso dall'hashing
+    """
+    start_date = selected_date - timedelta(days=days_before)
+    end_date = selected_date + timedelta(days=days_after)
+
+    fig = make_subplots(
+        rows=4, cols=1,
+        shared_xaxes=True,
+        vertical_spacing=0.03,
+        row_heights=[0.50, 0.15, 0.175, 0.175],
+        subplot_titles=(
+            f"{ticker} – Prezzo (D-{days_before} → D+{days_after})",
+            "Volume",
+            "Stocastico (%K/%D)",
+            "Stocastico RSI (%K/%D)"
+        )
+    )
+
+    # Colonne estratte una volta come array NumPy float32: Plotly le invia
+    # in base64 (typed array) invece di serializzarle numero per numero
+    dates = _dfp_ind['date'].to_numpy()
+    opens, highs, lows, closes = (
+        _dfp_ind[col].to_numpy(dtype=np.float32) for col in ('open', 'high', 'low', 'close')
+    )
+
+    # -------------------------
+    # ROW 1: Prezzo
+    # -------------------------
+    fig.add_trace(go.Candlestick(
+        x=dates,
+        open=opens,
+        high=highs,
+        low=lows,
+        close=closes,
+        name='Prezzo',
+        increasing_line_color='green',
+        decreasing_line_color='red'
+    ), row=1, col=1)
+
+    # Marker Ex-Dividend (stella dorata)
+    if price_ex:
+        fig.add_trace(go.Scatter(
+            x=[selected_date],
+            y=[price_ex],
+            mode='markers',
+            marker=dict(size=15, color='gold', symbol='star', line=dict(color='black', width=1)),
+            name='Ex-Date',
+            showlegend=True,
+            hovertemplate=f'Ex-Date: {selected_date}<br>Prezzo: €{price_ex:.2f}<extra></extra>'
+        ), row=1, col=1)
+
+    # Linea target recupero (prezzo pre-dividendo)
+    if price_before:
+        fig.add_hline(
+            y=price_before,
+            line_dash="dot",
+            line_color="green",
+            annotation_text=f"Target Recupero (€{price_before:.2f})",
+            annotation_position="right",
+            row=1, col=1
+        )
+
+    # -------------------------
+    # ROW 2: Volume
+    # -------------------------
+    colors = np.where(closes >= opens, 'green', 'red').tolist()
+
+    fig.add_trace(go.Bar(
+        x=dates,
+        y=_dfp_ind['volume'].to_numpy(),
+        marker_color=colors,
+        name='Volume',
+        showlegend=False
+    ), row=2, col=1)
+
+    # -------------------------
+    # ROW 3: Stocastico (linee in WebGL)
+    # -------------------------
+    fig.add_trace(go.Scattergl(
+        x=dates,
+        y=_dfp_ind['stoch_k'].to_numpy(dtype=np.float32),
+        name='Stoch %K',
+        line=dict(color='blue', width=1)
+    ), row=3, col=1)
+
+    fig.add_trace(go.Scattergl(
+        x=dates,
+        y=_dfp_ind['stoch_d'].to_numpy(dtype=np.float32),
+        name='Stoch %D',
+        line=dict(color='red', width=1)
+    ), row=3, col=1)
+
+    fig.add_hline(y=80, line_dash="dash", line_color="gray", opacity=0.5, row=3, col=1)
+    fig.add_hline(y=20, line_dash="dash", line_color="gray", opacity=0.5, row=3, col=1)
+
+    # -------------------------
+    # ROW 4: Stocastico RSI
+    # -------------------------
+    fig.add_trace(go.Scattergl(
+        x=dates,
+        y=_dfp_ind['stoch_rsi_k'].to_numpy(dtype=np.float32),
+        name='StochRSI %K',
+        line=dict(color='purple', width=1)
+    ), row=4, col=1)
+
+    fig.add_trace(go.Scattergl(
+        x=dates,
+        y=_dfp_ind['stoch_rsi_d'].to_numpy(dtype=np.float32),
+        name='StochRSI %D',
+        line=dict(color='orange', width=1)
+    ), row=4, col=1)
+
+    fig.add_hline(y=80, line_dash="dash", line_color="gray", opacity=0.5, row=4, col=1)
+    fig.add_hline(y=20, line_dash="dash", line_color="gray", opacity=0.5, row=4, col=1)
+
+    # -------------------------
+    # MARKERS PER PUNTI CHIAVE (D-10, D-DAY, D+45)
+    # -------------------------
+    # Aggiungi markers invisibili con annotazioni per i punti chiave
+    key_dates_info = [
+        (start_date, f"D-{days_before}", "blue"),
+        (selected_date, "D-DAY", "red"),
+        (end_date, f"D+{days_after}", "green")
+    ]
+
+    for date_val, label, color in key_dates_info:
+        # Trova il prezzo alla data (se esiste)
+        price_at_date = _dfp_ind[_dfp_ind['date'] == pd.Timestamp(date_val)]['close']
+        if not price_at_date.empty:
+            y_val = price_at_date.iloc[0]
+            fig.add_trace(go.Scatter(
+                x=[date_val],
+                y=[y_val],
+                mode='markers+text',
+                marker=dict(size=10, color=color, symbol='diamond'),
+                text=[label],
+                textposition='top center',
+                textfont=dict(size=10, color=color),
+                name=label,
+                showlegend=False,
+                hoverinfo='skip'
+            ), row=1, col=1)
+
+    # Layout generale
+    fig.update_xaxes(title_text="Data", row=4, col=1)
+    fig.update_yaxes(title_text="Prezzo (€)", row=1, col=1)
+    fig.update_yaxes(title_text="Volume", row=2, col=1)
+    fig.update_yaxes(title_text="%K/%D", row=3, col=1, range=[0, 100])
+    fig.update_yaxes(title_text="%K/%D", row=4, col=1, range=[0, 100])
+
+    fig.update_layout(
+        height=900,
+        hovermode='x unified',
+        showlegend=True,
+        xaxis_rangeslider_visible=False,
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=1.02,
+            xanchor="right",
+            x=1
+        )
+    )
+
+    return fig
+
+
+def dividend_options(df_divs_sorted: pd.DataFrame) -> dict:
+    """Etichette del selectbox dividendi → ex_date (nell'ordine di df_divs_sorted)"""
+    # zip sulle colonne (tolist mantiene i tipi Python/Timestamp delle etichette)
+    return {
+        f"{ex_date} – €{amount:.3f}": ex_date
+        for ex_date, amount in zip(df_divs_sorted['ex_date'].tolist(), df_divs_sorted['amount'].tolist())
+    }
+
+
+def dividend_focus_window(selected_date, days_before: int, days_after: int):
+    """
+    Intervallo D-days_before → D+days_after attorno al dividendo
+
+    Returns:
+        (inizio, fine) come date object
+    """
+    # Intervallo D-10 → D+45 (o personalizzato)
+    start_date = selected_date - timedelta(days=days_before)
+    end_date = selected_date + timedelta(days=days_after)
+
+    # Converti date per confronto con DataFrame (date objects)
+    start_date_cmp = start_date.date() if isinstance(start_date, datetime) else start_date
+    end_date_cmp = end_date.date() if isinstance(end_date, datetime) else end_date
+    return start_date_cmp, end_date_cmp
+
+
+@st.cache_data(max_entries=32)
+def load_prices_with_indicators(stock_id: int):
+    """
+    Storico prezzi completo del titolo con tutti gli indicatori (con cache,
+    max 32 titoli come load_prices)
+
+    Calcolato una volta per titolo: cambiare dividendo o intervallo nel
+    Frame 2 è solo uno slice, e gli indicatori ricorsivi (RSI di Wilder)
+    partono dall'inizio dello storico invece che da un buffer di 60 giorni
+    """
+    return calculate_all_indicators(load_prices(stock_id))
+
+
+def render_frame_dividend_focus(stock, bounds, df_divs):
     """
     Frame 2: Analisi focalizzata su singolo dividendo
     Intervallo: D-10 → D+45
@@ -345,16 +658,13 @@ def render_frame_dividend_focus(stock, df_prices, df_divs):
     """
     st.markdown("### 🎯 Analisi Tecnica Attorno al Dividendo (D-10 → D+45)")
 
-    if df_prices.empty or df_divs.empty:
+    if bounds is None or df_divs.empty:
         st.info("Servono prezzi e dividendi per questa analisi.")
         return
 
     # Selezione dividendo (ordinamento discendente: più recente prima)
     df_divs_sorted = df_divs.sort_values('ex_date', ascending=False)
-    div_options = {
-        f"{row['ex_date']} – €{row['amount']:.3f}": row['ex_date']
-        for _, row in df_divs_sorted.iterrows()
-    }
+    div_options = dividend_options(df_divs_sorted)
 
     if not div_options:
         st.warning("⚠️ Nessun dividendo disponibile per l'analisi")
@@ -369,41 +679,16 @@ def render_frame_dividend_focus(stock, df_prices, df_divs):
         days_before = col_a.number_input("Giorni prima", value=10, min_value=5, max_value=30, key="frame3_days_before")
         days_after = col_b.number_input("Giorni dopo", value=45, min_value=15, max_value=90, key="frame3_days_after")
 
-    # Intervallo D-10 → D+45 (o personalizzato)
-    start_date = selected_date - timedelta(days=days_before)
-    end_date = selected_date + timedelta(days=days_after)
-
-    # IMPORTANTE: Caricare dati extra prima per calcolare correttamente gli indicatori tecnici
-    # Gli indicatori come RSI e Stocastico richiedono ~20 giorni di storico
-    buffer_days = 60  # Buffer per calcolo indicatori
-    start_date_with_buffer = selected_date - timedelta(days=days_before + buffer_days)
+    start_date_cmp, end_date_cmp = dividend_focus_window(selected_date, days_before, days_after)
 
-    # Converti date per confronto con DataFrame (date objects)
-    start_date_buffer_cmp = start_date_with_buffer.date() if isinstance(start_date_with_buffer, datetime) else start_date_with_buffer
-    start_date_cmp = start_date.date() if isinstance(start_date, datetime) else start_date
-    end_date_cmp = end_date.date() if isinstance(end_date, datetime) else end_date
-
-    # Carica dati con buffer per calcolo indicatori
-    dfp_full = df_prices[
-        (df_prices['date'] >= start_date_buffer_cmp) &
-        (df_prices['date'] <= end_date_cmp)
-    ].copy()
-
-    if dfp_full.empty:
-        st.warning("⚠️ Nessun dato disponibile nell'intervallo selezionato.")
-        return
-
-    # Calcolo indicatori su dataset completo (con buffer)
-    dfp_ind_full = calculate_all_indicators(dfp_full)
+    # Indicatori sull'intero storico del titolo (cache per titolo)
+    dfp_ind_full = load_prices_with_indicators(stock.id)
     if dfp_ind_full is None:
         st.error("Errore nel calcolo degli indicatori.")
         return
 
     # Filtra per intervallo visualizzazione (D-10 → D+45)
-    dfp_ind = dfp_ind_full[
-        (dfp_ind_full['date'] >= start_date_cmp) &
-        (dfp_ind_full['date'] <= end_date_cmp)
-    ].copy()
+    dfp_ind = date_slice(dfp_ind_full, 'date', pd.Timestamp(start_date_cmp), pd.Timestamp(end_date_cmp))
 
     if dfp_ind.empty:
         st.warning("⚠️ Nessun dato disponibile nell'intervallo di visualizzazione.")
@@ -416,9 +701,13 @@ def render_frame_dividend_focus(stock, df_prices, df_divs):
     # Trova prezzi chiave (confronta con date object)
     selected_date_cmp = selected_date.date() if isinstance(selected_date, datetime) else selected_date
 
-    prices_before = dfp_ind[dfp_ind['date'] < selected_date_cmp]
-    prices_after = dfp_ind[dfp_ind['date'] > selected_date_cmp]
-    price_on_ex = dfp_ind[dfp_ind['date'] == selected_date_cmp]
+    # Righe prima / alla / dopo la ex-date con due ricerche binarie (date ordinate)
+    selected_ts = pd.Timestamp(selected_date_cmp)
+    i_ex = dfp_ind['date'].searchsorted(selected_ts, side='left')
+    j_ex = dfp_ind['date'].searchsorted(selected_ts, side='right')
+    prices_before = dfp_ind.iloc[:i_ex]
+    price_on_ex = dfp_ind.iloc[i_ex:j_ex]
+    prices_after = dfp_ind.iloc[j_ex:]
 
     price_before = prices_before['close'].iloc[-1] if len(prices_before) > 0 else None
     price_after = prices_after['close'].iloc[0] if len(prices_after) > 0 else None
@@ -522,7 +811,7 @@ def render_frame_dividend_focus(stock, df_prices, df_divs):
             st.metric("Recovery %", "N/D")
 
     with col4:
-        days_elapsed = (dfp_ind['date'].max() - selected_date_cmp).days
+        days_elapsed = (dfp_ind['date'].max() - selected_ts).days
         st.metric("Giorni da Ex-Date", f"{days_elapsed}", delta="giorni")
 
     st.markdown("---")
@@ -531,159 +820,10 @@ def render_frame_dividend_focus(stock, df_prices, df_divs):
     # SUBPLOT: Prezzo + Volume + Indicatori
     # =============================================================================
 
-    fig = make_subplots(
-        rows=4, cols=1,
-        shared_xaxes=True,
-        vertical_spacing=0.03,
-        row_heights=[0.50, 0.15, 0.175, 0.175],
-        subplot_titles=(
-            f"{stock.ticker} – Prezzo (D-{days_before} → D+{days_after})",
-            "Volume",
-            "Stocastico (%K/%D)",
-            "Stocastico RSI (%K/%D)"
-        )
+    fig = build_dividend_focus_figure(
+        stock.id, stock.ticker, selected_date_cmp, days_before, days_after,
+        price_ex, price_before, dfp_ind
     )
-
-    # -------------------------
-    # ROW 1: Prezzo
-    # -------------------------
-    fig.add_trace(go.Candlestick(
-        x=dfp_ind['date'],
-        open=dfp_ind['open'],
-        high=dfp_ind['high'],
-        low=dfp_ind['low'],
-        close=dfp_ind['close'],
-        name='Prezzo',
-        increasing_line_color='green',
-        decreasing_line_color='red'
-    ), row=1, col=1)
-
-    # Marker Ex-Dividend (stella dorata)
-    if price_ex:
-        fig.add_trace(go.Scatter(
-            x=[selected_date_cmp],
-            y=[price_ex],
-            mode='markers',
-            marker=dict(size=15, color='gold', symbol='star', line=dict(color='black', width=1)),
-            name='Ex-Date',
-            showlegend=True,
-            hovertemplate=f'Ex-Date: {selected_date_cmp}<br>Prezzo: €{price_ex:.2f}<extra></extra>'
-        ), row=1, col=1)
-
-    # Linea target recupero (prezzo pre-dividendo)
-    if price_before:
-        fig.add_hline(
-            y=price_before,
-            line_dash="dot",
-            line_color="green",
-            annotation_text=f"Target Recupero (€{price_before:.2f})",
-            annotation_position="right",
-            row=1, col=1
-        )
-
-    # -------------------------
-    # ROW 2: Volume
-    # -------------------------
-    colors = ['green' if row['close'] >= row['open'] else 'red'
-              for _, row in dfp_ind.iterrows()]
-
-    fig.add_trace(go.Bar(
-        x=dfp_ind['date'],
-        y=dfp_ind['volume'],
-        marker_color=colors,
-        name='Volume',
-        showlegend=False
-    ), row=2, col=1)
-
-    # -------------------------
-    # ROW 3: Stocastico
-    # -------------------------
-    fig.add_trace(go.Scatter(
-        x=dfp_ind['date'],
-        y=dfp_ind['stoch_k'],
-        name='Stoch %K',
-        line=dict(color='blue', width=1)
-    ), row=3, col=1)
-
-    fig.add_trace(go.Scatter(
-        x=dfp_ind['date'],
-        y=dfp_ind['stoch_d'],
-        name='Stoch %D',
-        line=dict(color='red', width=1)
-    ), row=3, col=1)
-
-    fig.add_hline(y=80, line_dash="dash", line_color="gray", opacity=0.5, row=3, col=1)
-    fig.add_hline(y=20, line_dash="dash", line_color="gray", opacity=0.5, row=3, col=1)
-
-    # -------------------------
-    # ROW 4: Stocastico RSI
-    # -------------------------
-    fig.add_trace(go.Scatter(
-        x=dfp_ind['date'],
-        y=dfp_ind['stoch_rsi_k'],
-        name='StochRSI %K',
-        line=dict(color='purple', width=1)
-    ), row=4, col=1)
-
-    fig.add_trace(go.Scatter(
-        x=dfp_ind['date'],
-        y=dfp_ind['stoch_rsi_d'],
-        name='StochRSI %D',
-        line=dict(color='orange', width=1)
-    ), row=4, col=1)
-
-    fig.add_hline(y=80, line_dash="dash", line_color="gray", opacity=0.5, row=4, col=1)
-    fig.add_hline(y=20, line_dash="dash", line_color="gray", opacity=0.5, row=4, col=1)
-
-    # -------------------------
-    # MARKERS PER PUNTI CHIAVE (D-10, D-DAY, D+45)
-    # -------------------------
-    # Aggiungi markers invisibili con annotazioni per i punti chiave
-    key_dates_info = [
-        (start_date_cmp, f"D-{days_before}", "blue"),
-        (selected_date_cmp, "D-DAY", "red"),
-        (end_date_cmp, f"D+{days_after}", "green")
-    ]
-
-    for date_val, label, color in key_dates_info:
-        # Trova il prezzo alla data (se esiste)
-        price_at_date = dfp_ind[dfp_ind['date'] == date_val]['close']
-        if not price_at_date.empty:
-            y_val = price_at_date.iloc[0]
-            fig.add_trace(go.Scatter(
-                x=[date_val],
-                y=[y_val],
-                mode='markers+text',
-                marker=dict(size=10, color=color, symbol='diamond'),
-                text=[label],
-                textposition='top center',
-                textfont=dict(size=10, color=color),
-                name=label,
-                showlegend=False,
-                hoverinfo='skip'
-            ), row=1, col=1)
-
-    # Layout generale
-    fig.update_xaxes(title_text="Data", row=4, col=1)
-    fig.update_yaxes(title_text="Prezzo (€)", row=1, col=1)
-    fig.update_yaxes(title_text="Volume", row=2, col=1)
-    fig.update_yaxes(title_text="%K/%D", row=3, col=1, range=[0, 100])
-    fig.update_yaxes(title_text="%K/%D", row=4, col=1, range=[0, 100])
-
-    fig.update_layout(
-        height=900,
-        hovermode='x unified',
-        showlegend=True,
-        xaxis_rangeslider_visible=False,
-        legend=dict(
-            orientation="h",
-            yanchor="bottom",
-            y=1.02,
-            xanchor="right",
-            x=1
-        )
-    )
-
     st.plotly_chart(fig, use_container_width=True)
 
     # =============================================================================
@@ -747,36 +887,35 @@ def render_frame_stats(stock, df_prices, df_divs):
         st.warning("⚠️ Nessun dato prezzi disponibile")
         return
 
-    dfp = df_prices.sort_values('date').reset_index(drop=True).copy()
-    dfp['return'] = dfp['close'].pct_change()
-    returns = dfp['return'].dropna()
+    dfp = df_prices.sort_values('date', ignore_index=True)
+
+    # Rendimenti giornalieri su array float64 (niente Series temporanee);
+    # NaN solo da 0/0, esclusi come faceva dropna
+    close = dfp['close'].to_numpy(dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        returns = close[1:] / close[:-1] - 1
+    returns = returns[~np.isnan(returns)]
 
     avg_return_annual = None
     volatility_annual = None
     cum_return = None
 
-    if not returns.empty:
-        avg_return_annual = returns.mean() * 252
-        volatility_annual = returns.std() * (252 ** 0.5)
-        cum_return = (1 + returns).prod() - 1
+    if returns.size:
+        # Media da una somma, varianza dal prodotto scalare degli scarti
+        # (BLAS), niente passate separate di mean/std
+        n = returns.size
+        mean = returns.sum() / n
+        dev = returns - mean
+        avg_return_annual = mean * 252
+        volatility_annual = np.sqrt(dev @ dev / (n - 1) * 252) if n > 1 else np.nan
+        # Somma dei log-rendimenti: numericamente più stabile del prodotto
+        cum_return = np.expm1(np.log1p(returns).sum())
 
     # Calcolo dividendi per anno
     if not df_divs.empty:
-        df_divs_enriched = df_divs.merge(
-            dfp[['date', 'close']],
-            left_on='ex_date',
-            right_on='date',
-            how='left'
-        ).rename(columns={'close': 'price_on_ex'})
-
-        df_divs_enriched['yield'] = df_divs_enriched.apply(
-            lambda row: row['amount'] / row['price_on_ex']
-            if pd.notnull(row['price_on_ex']) and row['price_on_ex'] != 0
-            else None,
-            axis=1
-        )
-        df_divs_enriched['year'] = pd.to_datetime(df_divs_enriched['ex_date']).dt.year
-        div_per_year = df_divs_enriched.groupby('year').size().mean()
+        # Media dividendi per anno = dividendi / anni distinti con dividendi
+        years = np.asarray(df_divs['ex_date'].tolist(), dtype='datetime64[Y]')
+        div_per_year = years.size / np.unique(years).size
     else:
         div_per_year = 0
 
@@ -829,20 +968,27 @@ def main():
     # Selezione titolo
     stock = select_stock()
 
-    # Caricamento dati con cache
-    df_prices, df_divs = load_stock_data(stock.id)
+    # Caricamento dati con cache: dividendi e limiti date; i prezzi li carica
+    # ogni frame per il proprio intervallo
+    df_divs = load_dividends(stock.id)
+    bounds = load_stock_bounds(stock.id)
 
     # FRAME 1: Prezzi & Dividendi (Vista Rapida)
     with st.expander("📉 Prezzi & Dividendi - Vista Rapida", expanded=True):
-        render_frame_price_dividends(stock, df_prices, df_divs)
+        render_frame_price_dividends(stock, bounds, df_divs)
+
+    # Frame 2 e 3: il corpo di un expander chiuso viene comunque eseguito a ogni
+    # rerun, quindi il calcolo parte solo dopo la spunta esplicita dell'utente
 
     # FRAME 2: Analisi Tecnica Attorno al Dividendo
     with st.expander("🎯 Analisi Tecnica Attorno al Dividendo (D-10 → D+45)", expanded=False):
-        render_frame_dividend_focus(stock, df_prices, df_divs)
+        if st.checkbox("Mostra analisi", value=False, key="show_frame_dividend_focus"):
+            render_frame_dividend_focus(stock, bounds, df_divs)
 
     # FRAME 3: Statistiche & Rendimento
     with st.expander("📈 Statistiche & Rendimento Cumulato", expanded=False):
-        render_frame_stats(stock, df_prices, df_divs)
+        if st.checkbox("Mostra statistiche", value=False, key="show_frame_stats"):
+            render_frame_stats(stock, load_prices(stock.id), df_divs)
 
 
 if __name__ == "__main__":
@@ -18,6 +18,9 @@ sys.path.insert(0, str(Path(__file__).parent.parent.parent / 'src'))
 
 from database.models import Stock, Dividend, PriceData, DataCollectionLog
 
+# Righe massime inviate al frontend per la tabella di dettaglio titoli
+MAX_TABLE_ROWS = 500
+
 # Page config
 st.set_page_config(
     page_title="Database Dashboard",
@@ -533,9 +536,9 @@ if not stock_details.empty:
     if show_only_issues:
         filtered_df = filtered_df[filtered_df['has_issues'] == '🔴']
 
-    # Mostra tabella
+    # Mostra tabella (troncata: il payload Arrow cresce con ogni riga inviata)
     st.dataframe(
-        filtered_df.rename(columns={
+        filtered_df.head(MAX_TABLE_ROWS).rename(columns={
             'has_issues': 'Status',
             'ticker': 'Ticker',
             'name': 'Nome',
@@ -556,6 +559,8 @@ if not stock_details.empty:
         hide_index=True,
         height=400
     )
+    if len(filtered_df) > MAX_TABLE_ROWS:
+        st.caption(f"Mostrati i primi {MAX_TABLE_ROWS} titoli su {len(filtered_df)}: usa i filtri per restringere la lista.")
 
     # Statistiche riepilogo
     col1, col2, col3 = st.columns(3)
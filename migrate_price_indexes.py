@@ -0,0 +1,44 @@
+"""
+Database Migration - Add Price Indexes
+Crea gli indici di price_data mancanti nei database creati prima di ix_price_stock_date
+"""
+
+import sys
+from pathlib import Path
+
+# database.* viene importato come dalle pagine Streamlit (src nel path)
+sys.path.insert(0, str(Path(__file__).parent / 'src'))
+
+from database.engine import create_sqlite_engine, ensure_price_indexes  # noqa: E402
+
+# Path del database
+DB_PATH = 'data/dividend_recovery.db'
+
+
+def migrate_database():
+    """Crea gli indici di price_data se non esistono"""
+
+    print("=" * 60)
+    print("DATABASE MIGRATION - PRICE INDEXES")
+    print("=" * 60)
+
+    engine = create_sqlite_engine(DB_PATH)
+
+    print("\n🔨 Creazione indici mancanti...")
+    for name in ensure_price_indexes(engine):
+        print(f"   ✅ Indice '{name}' presente")
+
+    engine.dispose()
+
+    print("\n" + "=" * 60)
+    print("✅ MIGRAZIONE COMPLETATA CON SUCCESSO")
+    print("=" * 60)
+
+
+if __name__ == '__main__':
+    try:
+        migrate_database()
+    except Exception as e:
+        print(f"\n❌ ERRORE DURANTE LA MIGRAZIONE:")
+        print(f"   {str(e)}")
+        sys.exit(1)
@@ -1,6 +1,7 @@
 """
 Database utilities - session management and data retrieval.
 """
+import numpy as np
 import pandas as pd
 from pathlib import Path
 from typing import Optional
@@ -98,29 +99,31 @@ def get_price_dataframe(
         >>> df = get_price_dataframe(session, stock.id, start_date='2024-01-01')
     """
     try:
-        query = session.query(PriceData).filter_by(stock_id=stock_id)
+        query = session.query(
+            PriceData.date, PriceData.open, PriceData.high,
+            PriceData.low, PriceData.close, PriceData.volume
+        ).filter(PriceData.stock_id == stock_id)
 
         if start_date:
             query = query.filter(PriceData.date >= start_date)
         if end_date:
             query = query.filter(PriceData.date <= end_date)
 
-        prices = query.order_by(PriceData.date).all()
+        rows = query.order_by(PriceData.date).all()
 
-        if not prices:
+        if not rows:
             return None
 
-        df = pd.DataFrame([{
-            'date': p.date,
-            'open': p.open,
-            'high': p.high,
-            'low': p.low,
-            'close': p.close,
-            'volume': p.volume
-        } for p in prices])
-
-        df['date'] = pd.to_datetime(df['date'])
-        df = df.set_index('date')
+        # Column-oriented build: one array per column instead of a dict per row
+        dates, opens, highs, lows, closes, volumes = zip(*rows)
+
+        df = pd.DataFrame({
+            'open': np.asarray(opens, dtype=np.float64),
+            'high': np.asarray(highs, dtype=np.float64),
+            'low': np.asarray(lows, dtype=np.float64),
+            'close': np.asarray(closes, dtype=np.float64),
+            'volume': list(volumes)  # nullable Integer: int64, float64 if any NULL
+        }, index=pd.DatetimeIndex(pd.to_datetime(dates), name='date'))
 
         return df
 
@@ -0,0 +1,62 @@
+"""
+SQLite engine factory with PRAGMA tuning for the Streamlit pages.
+"""
+from sqlalchemy import create_engine, event
+
+from database.models import PriceData
+
+
+# Applicate a ogni nuova connessione DBAPI del pool. Solo PRAGMA di
+# connessione: journal_mode=WAL verrebbe scritto nel file del database
+# (tracciato da git) anche da pagine che leggono soltanto
+SQLITE_PRAGMAS = (
+    "PRAGMA cache_size=-65536",       # 64 MB page cache
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",     # 256 MB memory-mapped I/O
+)
+
+
+def create_sqlite_engine(db_path, echo=False):
+    """
+    Create a SQLAlchemy engine for a SQLite file with tuned PRAGMAs.
+
+    Args:
+        db_path: Path to the SQLite database file
+        echo: Echo SQL statements
+
+    Returns:
+        SQLAlchemy Engine
+    """
+    engine = create_engine(
+        f"sqlite:///{db_path}",
+        echo=echo,
+        pool_pre_ping=True,
+        connect_args={'check_same_thread': False}
+    )
+
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_conn, _connection_record):
+        cursor = dbapi_conn.cursor()
+        for pragma in SQLITE_PRAGMAS:
+            cursor.execute(pragma)
+        cursor.close()
+
+    return engine
+
+
+def ensure_price_indexes(engine):
+    """
+    Create the PriceData indexes missing from an existing database.
+
+    create_all() does not add indexes to tables that already exist, so
+    databases created before ix_price_stock_date are upgraded here.
+    Called by migrate_price_indexes.py, not by the page engines.
+
+    Returns:
+        List of the index names checked
+    """
+    names = []
+    for index in PriceData.__table__.indexes:
+        index.create(bind=engine, checkfirst=True)
+        names.append(index.name)
+    return names
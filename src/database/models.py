@@ -3,7 +3,7 @@ Database models for Dividend Recovery System
 SQLAlchemy ORM models
 """
 
-from sqlalchemy import Column, Integer, String, Float, Date, DateTime, ForeignKey, Boolean
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime, ForeignKey, Boolean, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -72,6 +72,11 @@ class PriceData(Base):
     volume = Column(Integer)
     adjusted_close = Column(Float)
     
+    # Indice composito: copre WHERE stock_id = ? ORDER BY date senza sort
+    __table_args__ = (
+        Index('ix_price_stock_date', 'stock_id', 'date'),
+    )
+    
     # Relationships
     stock = relationship('Stock', back_populates='prices')
     
@@ -0,0 +1,22 @@
+"""
+Strategy simulation helpers (kernels numerici condivisi tra le strategie).
+"""
+from ._kernels import (
+    scan_recovery, dividend_window_metrics, DIVIDEND_METRIC_COLUMNS,
+    rolling_min, rolling_max, rolling_mean, rsi_wilder, stochastic_oscillator,
+)
+from .price_series import PriceSeries
+from ._njit import NUMBA_AVAILABLE
+
+__all__ = [
+    'scan_recovery',
+    'dividend_window_metrics',
+    'DIVIDEND_METRIC_COLUMNS',
+    'rolling_min',
+    'rolling_max',
+    'rolling_mean',
+    'rsi_wilder',
+    'stochastic_oscillator',
+    'PriceSeries',
+    'NUMBA_AVAILABLE',
+]
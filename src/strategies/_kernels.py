@@ -0,0 +1,306 @@
+"""
+Numeric kernels for the strategy simulations.
+
+Operano su array NumPy (float64) e indici posizionali, così le strategie
+(e l'analisi pattern, gli indicatori delle pagine) condividono kernel compilati (numba se disponibile).
+"""
+import numpy as np
+
+from ._njit import njit
+
+
+@njit(cache=True, nogil=True)
+def scan_recovery(closes, date_ords, start_idx, start_ord, threshold, max_days):
+    """
+    Find the first close >= threshold in closes[start_idx:start_idx + max_days].
+
+    Args:
+        closes: float64 array of close prices (sorted by date)
+        date_ords: int64 day ordinals (days since epoch) aligned with closes
+        start_idx: Position of D0 in closes
+        start_ord: Day ordinal of the requested start date (D0)
+        threshold: Target price (typically D-1 close)
+        max_days: Maximum number of trading days to scan
+
+    Returns:
+        (idx, days, recovered):
+            - idx: position of the first hit, or of the last scanned day
+            - days: trading days from start_idx if recovered (0 = D0),
+              calendar days from start_ord otherwise
+            - recovered: True if the threshold was reached
+        (-1, -1, False) if the window is empty
+    """
+    end_idx = min(start_idx + max_days, closes.shape[0])
+    if end_idx <= start_idx:
+        return -1, -1, False
+    for i in range(start_idx, end_idx):
+        if closes[i] >= threshold:
+            return i, i - start_idx, True
+    last = end_idx - 1
+    return last, date_ords[last] - start_ord, False
+
+
+# Columns of the matrix returned by dividend_window_metrics (NaN = not available)
+DIVIDEND_METRIC_COLUMNS = (
+    'valid', 'i_d0', 'p_d1', 'p_d0', 'gap_pct',
+    'recovery_d5_pct', 'recovery_d10_pct', 'recovery_d15_pct', 'recovery_d30_pct',
+    'days_to_50pct_gap', 'trend_pre', 'vol_pre', 'volume_mean_pre', 'min_within_d3_flag',
+)
+_N_METRICS = len(DIVIDEND_METRIC_COLUMNS)
+
+
+@njit(cache=True)
+def _pct(a, b):
+    """(a - b) / b * 100, NaN if b is zero."""
+    if b == 0.0:
+        return np.nan
+    return (a - b) / b * 100.0
+
+
+@njit(cache=True, nogil=True)
+def dividend_window_metrics(date_ords, closes, volumes, ex_ords, pre_window, post_window):
+    """
+    Pre/post-dividend metrics for every ex-date in a single pass.
+
+    Each dividend only sees the prices in [ex - pre_window, ex + post_window]
+    (calendar days); lookups are binary searches on date_ords.
+
+    Args:
+        date_ords: int64 day ordinals of the price rows (sorted)
+        closes: float64 close prices aligned with date_ords
+        volumes: float64 volumes aligned with date_ords (NaN allowed)
+        ex_ords: int64 day ordinals of the ex-dates
+        pre_window: Calendar days before the ex-date
+        post_window: Calendar days after the ex-date
+
+    Returns:
+        float64 matrix (len(ex_ords), len(DIVIDEND_METRIC_COLUMNS));
+        valid = 0.0 rows (no D-1 or no D0 in the window) are all NaN otherwise
+    """
+    n_div = ex_ords.shape[0]
+    out = np.full((n_div, _N_METRICS), np.nan)
+
+    for k in range(n_div):
+        ex = ex_ords[k]
+        out[k, 0] = 0.0
+        lo = np.searchsorted(date_ords, ex - pre_window, side='left')
+        hi = np.searchsorted(date_ords, ex + post_window, side='right')
+        i0 = np.searchsorted(date_ords, ex, side='left')
+
+        # D-1 = last close before ex-date, D0 = first close on/after it
+        if i0 <= lo or i0 >= hi:
+            continue
+        p_d1 = closes[i0 - 1]
+        p_d0 = closes[i0]
+        out[k, 0] = 1.0
+        out[k, 1] = i0
+        out[k, 2] = p_d1
+        out[k, 3] = p_d0
+        out[k, 4] = -_pct(p_d1, p_d0)
+
+        # Recovery vs D-1 at the first close on/after D+n
+        for c, n_days in enumerate((5, 10, 15, 30)):
+            i = np.searchsorted(date_ords, ex + n_days, side='left')
+            if i < hi:
+                out[k, 5 + c] = _pct(closes[i], p_d1)
+
+        # Calendar days to recover 50% of the gap (first hit from D0)
+        half_target = p_d0 + 0.5 * (p_d1 - p_d0)
+        for i in range(i0, hi):
+            if closes[i] >= half_target:
+                out[k, 9] = date_ords[i] - ex
+                break
+
+        # Pre-window [lo, i0): OLS slope over position, std of returns, mean volume
+        n_x = 0
+        sx = 0.0
+        sy = 0.0
+        for i in range(lo, i0):
+            if not np.isnan(closes[i]):
+                n_x += 1
+                sx += i - lo
+                sy += closes[i]
+        if n_x >= 2:
+            mx = sx / n_x
+            my = sy / n_x
+            sxy = 0.0
+            sxx = 0.0
+            for i in range(lo, i0):
+                if not np.isnan(closes[i]):
+                    dx = (i - lo) - mx
+                    sxy += dx * (closes[i] - my)
+                    sxx += dx * dx
+            out[k, 10] = sxy / sxx
+
+        n_r = 0
+        sr = 0.0
+        for i in range(lo + 1, i0):
+            r = closes[i] / closes[i - 1] - 1.0
+            if not np.isnan(r):
+                n_r += 1
+                sr += r
+        if n_r >= 2:
+            mean_r = sr / n_r
+            ss = 0.0
+            for i in range(lo + 1, i0):
+                r = closes[i] / closes[i - 1] - 1.0
+                if not np.isnan(r):
+                    ss += (r - mean_r) * (r - mean_r)
+            out[k, 11] = np.sqrt(ss / (n_r - 1))
+
+        n_v = 0
+        sv = 0.0
+        for i in range(lo, i0):
+            if not np.isnan(volumes[i]):
+                n_v += 1
+                sv += volumes[i]
+        if n_v > 0:
+            out[k, 12] = sv / n_v
+
+        # Minimum within (D0, D+3] below the D0 close
+        j0 = np.searchsorted(date_ords, ex, side='right')
+        j3 = np.searchsorted(date_ords, ex + 3, side='right')
+        min3 = np.nan
+        for i in range(j0, j3):
+            if not np.isnan(closes[i]) and (np.isnan(min3) or closes[i] < min3):
+                min3 = closes[i]
+        out[k, 13] = 1.0 if (not np.isnan(min3) and min3 < p_d0) else 0.0
+
+    return out
+
+
+@njit(cache=True, nogil=True)
+def _rolling_extreme(values, window, is_max):
+    """Rolling min/max with a monotonic deque of indices (amortized O(1) per step)."""
+    n = values.shape[0]
+    out = np.full(n, np.nan)
+    dq = np.empty(n, dtype=np.int64)
+    head = 0
+    tail = 0
+    nans = 0
+    for i in range(n):
+        v = values[i]
+        if np.isnan(v):
+            nans += 1
+        else:
+            if is_max:
+                while tail > head and values[dq[tail - 1]] <= v:
+                    tail -= 1
+            else:
+                while tail > head and values[dq[tail - 1]] >= v:
+                    tail -= 1
+            dq[tail] = i
+            tail += 1
+        if i >= window and np.isnan(values[i - window]):
+            nans -= 1
+        while tail > head and dq[head] <= i - window:
+            head += 1
+        if i >= window - 1 and nans == 0:
+            out[i] = values[dq[head]]
+    return out
+
+
+@njit(cache=True, nogil=True)
+def rolling_min(values, window):
+    """
+    Rolling minimum over `window` observations.
+
+    Same semantics as pandas rolling(window).min(): NaN until the window is
+    full and for any window containing a NaN.
+    """
+    return _rolling_extreme(values, window, False)
+
+
+@njit(cache=True, nogil=True)
+def rolling_max(values, window):
+    """Rolling maximum over `window` observations (see rolling_min)."""
+    return _rolling_extreme(values, window, True)
+
+
+@njit(cache=True, nogil=True)
+def rolling_mean(values, window):
+    """
+    Rolling mean over `window` observations with a running sum.
+
+    Same semantics as pandas rolling(window).mean(): NaN until the window is
+    full and for any window containing a NaN.
+    """
+    n = values.shape[0]
+    out = np.full(n, np.nan)
+    total = 0.0
+    nans = 0
+    for i in range(n):
+        v = values[i]
+        if np.isnan(v):
+            nans += 1
+        else:
+            total += v
+        if i >= window:
+            old = values[i - window]
+            if np.isnan(old):
+                nans -= 1
+            else:
+                total -= old
+        if i >= window - 1 and nans == 0:
+            out[i] = total / window
+    return out
+
+
+@njit(cache=True, nogil=True)
+def rsi_wilder(close, period):
+    """
+    RSI with Wilder smoothing in a single pass.
+
+    The first average gain/loss is the simple mean of the first `period`
+    deltas, then avg = (avg_prev * (period - 1) + current) / period.
+    NaN deltas count as no change; the first `period` values are NaN.
+
+    Returns:
+        float64 array aligned with close (100 if there are no losses,
+        NaN if there are neither gains nor losses)
+    """
+    n = close.shape[0]
+    out = np.full(n, np.nan)
+    avg_gain = 0.0
+    avg_loss = 0.0
+    for i in range(1, n):
+        delta = close[i] - close[i - 1]
+        gain = delta if delta > 0.0 else 0.0
+        loss = -delta if delta < 0.0 else 0.0
+        if i <= period:
+            avg_gain += gain / period
+            avg_loss += loss / period
+            if i < period:
+                continue
+        else:
+            avg_gain = (avg_gain * (period - 1) + gain) / period
+            avg_loss = (avg_loss * (period - 1) + loss) / period
+        if avg_loss > 0.0:
+            out[i] = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+        elif avg_gain > 0.0:
+            out[i] = 100.0
+    return out
+
+
+@njit(cache=True, nogil=True)
+def stochastic_oscillator(low, high, close, k_period, d_period):
+    """
+    Stochastic %K/%D in one compiled call.
+
+    %K = 100 * (close - lowest low) / (highest high - lowest low) over
+    `k_period` observations, %D = rolling mean of %K over `d_period`.
+    Pass the same series three times for a stochastic of a single series
+    (e.g. Stoch RSI). %K is NaN during warm-up and where the range is zero.
+
+    Returns:
+        (k, d) float64 arrays aligned with close
+    """
+    lowest = _rolling_extreme(low, k_period, False)
+    highest = _rolling_extreme(high, k_period, True)
+    n = close.shape[0]
+    k = np.full(n, np.nan)
+    for i in range(n):
+        rng = highest[i] - lowest[i]
+        if rng != 0.0:
+            k[i] = 100.0 * (close[i] - lowest[i]) / rng
+    return k, rolling_mean(k, d_period)
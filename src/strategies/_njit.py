@@ -0,0 +1,17 @@
+"""
+Optional numba JIT: usa numba.njit se installato, altrimenti un decoratore no-op.
+"""
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """Fallback senza numba: restituisce la funzione Python invariata."""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+
+        def decorator(func):
+            return func
+        return decorator
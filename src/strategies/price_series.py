@@ -0,0 +1,42 @@
+"""
+PriceSeries - daily prices as parallel NumPy arrays for the strategy code.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+
+@dataclass(frozen=True)
+class PriceSeries:
+    """
+    Daily prices of one stock, sorted by date, without a DataFrame.
+
+    Attributes:
+        dates: datetime64 array (converted to Timestamp only for display)
+        date_ords: int64 day ordinals (days since epoch) for arithmetic and lookups
+        opens: float64 open prices
+        closes: float64 close prices
+    """
+    dates: np.ndarray
+    date_ords: np.ndarray
+    opens: np.ndarray
+    closes: np.ndarray
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> 'PriceSeries':
+        """Build from a date-indexed DataFrame with 'open' and 'close' columns."""
+        dates = df.index.values
+        return cls(
+            dates=dates,
+            date_ords=dates.astype('datetime64[D]').astype(np.int64),
+            opens=np.ascontiguousarray(df['open'].to_numpy(dtype=np.float64)),
+            closes=np.ascontiguousarray(df['close'].to_numpy(dtype=np.float64)),
+        )
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    def date_at(self, idx: int) -> pd.Timestamp:
+        """Date at position idx as a Timestamp."""
+        return pd.Timestamp(self.dates[idx])
@@ -2,7 +2,7 @@
 Shared utilities for Dividend Recovery System.
 """
 from .recovery_analysis import find_recovery, analyze_all_dividends, calculate_recovery_statistics
-from .database import get_database_session, get_price_dataframe, session_scope, DatabaseError
+from database.database import get_database_session, get_price_dataframe, session_scope, DatabaseError
 from .validation import validate_price_data, validate_dividend_data, ValidationError
 from .logging_config import get_logger, OperationLogger, setup_logging
 from .pattern_analysis import (
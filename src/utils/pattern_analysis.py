@@ -18,9 +18,10 @@ import numpy as np
 from typing import Dict, List, Optional, Tuple, Any
 from datetime import datetime, timedelta
 from dataclasses import dataclass
+from functools import lru_cache
 
 from config import get_config
-from .database import get_price_dataframe
+from database.database import get_price_dataframe
 from .recovery_analysis import find_recovery
 from .validation import validate_price_data, ValidationError
 from .logging_config import get_logger
@@ -398,10 +399,45 @@ def analyze_all_dividends(
     return pd.DataFrame(results)
 
 
+# Pre-dividend feature columns carry a window label such as 'D-10_D-5_...' or 'D_...'
+PRE_FEATURE_PATTERN = r'D[-_]'
+
+
+@lru_cache(maxsize=32)
+def _pre_feature_columns(columns: Tuple[str, ...]) -> Tuple[str, ...]:
+    """
+    Pre-dividend feature columns, matched with one vectorized regex.
+
+    Cached per column schema, so repeated calls on the same frame layout
+    skip the scan entirely.
+    """
+    idx = pd.Index(columns, dtype=object)
+    return tuple(idx[idx.str.contains(PRE_FEATURE_PATTERN, regex=True, na=False)])
+
+
+def _cross_correlation(P: np.ndarray, Q: np.ndarray) -> np.ndarray:
+    """
+    Pearson correlation of every column of P with every column of Q.
+
+    Columns are only mean-centered; the cross-product comes from a single
+    einsum contraction (no transposed copy) and is scaled afterwards by the
+    outer product of the column stds. Constant columns yield NaN, as with
+    np.corrcoef.
+    """
+    n = P.shape[0]
+    P_c = P - P.mean(axis=0)
+    Q_c = Q - Q.mean(axis=0)
+    cov = np.einsum('ij,ik->jk', P_c, Q_c, optimize=True)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        corr = cov / (n * np.outer(P_c.std(axis=0), Q_c.std(axis=0)))
+    return corr.astype(np.float64)
+
+
 def find_correlations(
     df: pd.DataFrame,
     min_correlation: Optional[float] = None,
-    method: Optional[str] = None
+    method: Optional[str] = None,
+    top_n: Optional[int] = None
 ) -> pd.DataFrame:
     """
     Find correlations between pre-dividend features and recovery metrics.
@@ -410,6 +446,7 @@ def find_correlations(
         df: Pattern analysis DataFrame
         min_correlation: Minimum correlation threshold (defaults to config)
         method: Correlation method - 'pearson', 'spearman', or 'kendall'
+        top_n: Keep only the N strongest pairs (None = all above threshold)
 
     Returns:
         DataFrame with top correlations sorted by absolute value
@@ -423,7 +460,7 @@ def find_correlations(
         method = cfg.pattern_analysis.correlation_method
 
     # Identify pre and post columns
-    pre_cols = [col for col in df.columns if any(w in col for w in ['D-', 'D_'])]
+    pre_cols = list(_pre_feature_columns(tuple(df.columns)))
     post_cols = [
         'recovery_d5_pct', 'recovery_d10_pct', 'recovery_d15_pct',
         'gap_recovery_d5_pct', 'gap_recovery_d10_pct', 'gap_recovery_d15_pct',
@@ -435,20 +472,33 @@ def find_correlations(
         logger.warning("Insufficient columns for correlation analysis")
         return pd.DataFrame()
 
-    # Calculate correlations
-    corr_matrix = df[pre_cols + post_cols].corr(method=method)
-    correlations = corr_matrix.loc[pre_cols, post_cols]
-
-    # Flatten and filter
-    corr_flat = correlations.unstack().reset_index()
-    corr_flat.columns = ['post_metric', 'pre_feature', 'correlation']
-
-    # Filter by minimum threshold
-    corr_flat = corr_flat[corr_flat['correlation'].abs() >= min_correlation]
-
-    # Sort by absolute correlation
-    corr_flat['abs_correlation'] = corr_flat['correlation'].abs()
-    corr_flat = corr_flat.sort_values('abs_correlation', ascending=False)
+    # Calculate correlations (pre x post block only); float32 C-contiguous
+    # feature matrix halves the memory traffic of the contraction
+    values = np.ascontiguousarray(df[pre_cols + post_cols].to_numpy(dtype=np.float32))
+
+    if method == 'pearson' and not np.isnan(values).any():
+        # Center each column once, then one contraction gives the cross block
+        corr = _cross_correlation(values[:, :len(pre_cols)], values[:, len(pre_cols):])
+    else:
+        # Rank methods and NaN (pairwise-complete) handling stay with pandas
+        corr_matrix = df[pre_cols + post_cols].corr(method=method)
+        corr = corr_matrix.loc[pre_cols, post_cols].to_numpy()
+
+    # Flatten (post-major, as unstack) and filter by minimum threshold
+    post_idx, pre_idx = np.nonzero(np.abs(corr.T) >= min_correlation)
+    abs_corr = np.abs(corr[pre_idx, post_idx])
+
+    # Top-N by |r|: argpartition selects in linear time, only the kept pairs get sorted
+    keep = np.arange(len(abs_corr))
+    if top_n is not None and top_n < len(abs_corr):
+        keep = np.argpartition(-abs_corr, top_n - 1)[:top_n] if top_n > 0 else keep[:0]
+    order = keep[np.argsort(-abs_corr[keep], kind='stable')]
+
+    corr_flat = pd.DataFrame({
+        'post_metric': np.asarray(post_cols, dtype=object)[post_idx[order]],
+        'pre_feature': np.asarray(pre_cols, dtype=object)[pre_idx[order]],
+        'correlation': corr[pre_idx[order], post_idx[order]],
+    })
 
     logger.info(
         f"Found {len(corr_flat)} significant correlations (|r| >= {min_correlation})",
@@ -478,29 +528,29 @@ def find_similar_patterns(
     Returns:
         DataFrame with similar patterns and their recovery outcomes
     """
-    from sklearn.preprocessing import StandardScaler
-    from sklearn.metrics.pairwise import cosine_similarity
-
     if similarity_threshold is None:
         cfg = get_config()
         similarity_threshold = cfg.pattern_analysis.similarity_threshold
 
     # Extract pre-dividend features
-    pre_cols = [col for col in df.columns if any(w in col for w in ['D-', 'D_'])]
+    pre_cols = list(_pre_feature_columns(tuple(df.columns)))
     pre_cols = [col for col in pre_cols if col not in ['D0_open', 'D-1_close']]
 
     if not pre_cols:
         logger.warning("No pre-dividend features for similarity analysis")
         return pd.DataFrame()
 
-    # Normalize features
-    scaler = StandardScaler()
-    X = df[pre_cols].fillna(0)
-    X_scaled = scaler.fit_transform(X)
-
-    # Calculate similarity to target
-    target_vector = X_scaled[target_idx].reshape(1, -1)
-    similarities = cosine_similarity(target_vector, X_scaled)[0]
+    # Standardize features (population std; constant columns are left unscaled)
+    X = np.ascontiguousarray(df[pre_cols].fillna(0).to_numpy(dtype=np.float32))
+    std = X.std(axis=0)
+    std[std == 0] = 1.0
+    X_scaled = (X - X.mean(axis=0)) / std
+
+    # Cosine similarity: unit-normalize rows once, then one matrix-vector product
+    norms = np.linalg.norm(X_scaled, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    X_norm = X_scaled / norms
+    similarities = (X_norm @ X_norm[target_idx]).astype(np.float64)
 
     # Create results DataFrame
     results = df.copy()
@@ -46,8 +46,9 @@ def find_recovery(
 
     start_date = pd.Timestamp(start_date)
 
-    # Filter data >= start_date and take max_days
-    future_data = df[df.index >= start_date].head(max_days)
+    # Take max_days rows from start_date on (binary search on the sorted index)
+    start_idx = df.index.searchsorted(start_date, side='left')
+    future_data = df.iloc[start_idx:start_idx + max_days]
 
     if future_data.empty:
         return {
@@ -58,22 +59,24 @@ def find_recovery(
             'reason': 'no_data'
         }
 
-    # Search for first day with close >= target
-    # enumerate starts from 0: day 0 = same day (D0)
-    for i, (date, row) in enumerate(future_data.iterrows()):
-        if row['close'] >= target_price:
-            return {
-                'recovery_date': date,
-                'recovery_days': i,  # 0 = same day, 1 = next day, etc.
-                'recovery_price': row['close'],
-                'recovered': True,
-                'reason': 'recovered'
-            }
+    # Search for first day with close >= target (vectorized compare)
+    # position 0 = same day (D0)
+    closes = future_data['close'].to_numpy()
+    hits = closes >= target_price
+    if hits.any():
+        i = int(hits.argmax())
+        return {
+            'recovery_date': future_data.index[i],
+            'recovery_days': i,  # 0 = same day, 1 = next day, etc.
+            'recovery_price': closes[i],
+            'recovered': True,
+            'reason': 'recovered'
+        }
 
     # Did not recover within max_days
     # Return the last available day
     last_date = future_data.index[-1]
-    last_price = future_data.iloc[-1]['close']
+    last_price = closes[-1]
 
     # Calculate real days passed from start_date to last day
     days_passed = (last_date - start_date).days
@@ -133,20 +136,21 @@ def analyze_all_dividends(
     for div in dividends:
         ex_date = pd.Timestamp(div.ex_date)
 
+        # D0 position (binary search on the sorted index): D-1 = ex_idx - 1
+        ex_idx = df.index.searchsorted(ex_date, side='left')
+
         # Find D-1 close (recovery target)
-        dates_before = df[df.index < ex_date]
-        if dates_before.empty:
+        if ex_idx == 0:
             continue
 
-        d_minus_1 = dates_before.index[-1]
-        target_price = df.loc[d_minus_1, 'close']
+        target_price = df['close'].iat[ex_idx - 1]
 
         # D0 prices
-        if ex_date not in df.index:
+        if ex_idx == len(df.index) or df.index[ex_idx] != ex_date:
             continue
 
-        d0_open = df.loc[ex_date, 'open']
-        d0_close = df.loc[ex_date, 'close']
+        d0_open = df['open'].iat[ex_idx]
+        d0_close = df['close'].iat[ex_idx]
 
         # Gap calculation
         gap = target_price - d0_open
@@ -258,14 +262,15 @@ def calculate_price_evolution(
 
     ex_date = pd.Timestamp(ex_date)
     evolution = {}
+    closes = df['close'].to_numpy()  # positional access, no label lookups
 
     for days in windows:
         future_date = ex_date + pd.Timedelta(days=days)
-        future_prices = df[df.index >= future_date]
+        pos = df.index.searchsorted(future_date, side='left')
 
-        if not future_prices.empty:
-            actual_date = future_prices.index[0]
-            price = future_prices.iloc[0]['close']
+        if pos < len(closes):
+            actual_date = df.index[pos]
+            price = closes[pos]
             pct_change = ((price - d_minus_1_close) / d_minus_1_close) * 100
 
             evolution[days] = {
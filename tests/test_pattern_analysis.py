@@ -3,6 +3,7 @@ Unit tests for pattern analysis module.
 """
 import pytest
 import pandas as pd
+import numpy as np
 from datetime import datetime, timedelta
 import sys
 from pathlib import Path
@@ -15,6 +16,7 @@ from utils.pattern_analysis import (
     calculate_recovery_metrics,
     analyze_dividend,
     find_correlations,
+    find_similar_patterns,
     WindowFeatures,
     RecoveryMetrics,
 )
@@ -336,6 +338,57 @@ class TestFindCorrelations:
 
         assert len(high_corr) <= len(low_corr)
 
+    def test_matches_pandas_pearson(self):
+        """Matmul Pearson path should agree with pandas .corr()."""
+        rng = np.random.default_rng(0)
+        df = pd.DataFrame({
+            'D-10_D-5_trend_pct': rng.normal(size=40),
+            'D-3_D-1_volatility': rng.normal(size=40),
+            'recovery_d5_pct': rng.normal(size=40),
+            'gap_pct': rng.normal(size=40),
+        })
+
+        correlations = find_correlations(df, min_correlation=0.0, method='pearson')
+        expected = df.corr(method='pearson')
+
+        assert len(correlations) == 4
+        for _, row in correlations.iterrows():
+            assert row['correlation'] == pytest.approx(
+                expected.loc[row['pre_feature'], row['post_metric']]
+            )
+
+    def test_top_n_keeps_strongest(self):
+        """top_n should return the N largest |r| pairs, sorted descending."""
+        df = self.create_correlation_test_data()
+
+        all_corr = find_correlations(df, min_correlation=0.0)
+        top = find_correlations(df, min_correlation=0.0, top_n=1)
+
+        assert len(all_corr) > 1
+        assert len(top) == 1
+        assert list(top['correlation'].abs()) == pytest.approx(
+            list(all_corr['correlation'].abs().head(len(top)))
+        )
+
+
+
+class TestFindSimilarPatterns:
+    """Test find_similar_patterns function."""
+
+    def test_identical_pattern_ranked_first(self):
+        """A row with the same pre-features as the target should score 1.0."""
+        df = pd.DataFrame({
+            'D-5_D-1_trend_pct': [1.0, 1.0, -2.0, 0.5],
+            'D-3_D-1_volatility': [0.2, 0.2, 0.9, 0.4],
+            'recovery_d5_pct': [3.0, 2.5, -1.0, 0.0],
+        })
+
+        similar = find_similar_patterns(df, target_idx=0, similarity_threshold=0.0, top_n=2)
+
+        assert 0 not in similar.index
+        assert similar.index[0] == 1
+        assert similar['similarity'].iloc[0] == pytest.approx(1.0)
+
 
 if __name__ == '__main__':
     pytest.main([__file__, '-v'])
@@ -0,0 +1,196 @@
+"""
+Unit tests for strategy numeric kernels.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+import re
+import sys
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from strategies import (
+    scan_recovery, dividend_window_metrics, DIVIDEND_METRIC_COLUMNS, PriceSeries,
+    rolling_min, rolling_max, rolling_mean, rsi_wilder, stochastic_oscillator,
+)
+
+
+def day_ords(n, start='2024-01-01'):
+    """Helper: consecutive calendar-day ordinals."""
+    first = np.datetime64(start, 'D').astype(np.int64)
+    return np.arange(first, first + n, dtype=np.int64)
+
+
+class TestScanRecovery:
+    """Test scan_recovery kernel."""
+
+    def test_recovery_same_day(self):
+        """Target reached on D0 returns 0 days."""
+        closes = np.array([10.0, 9.5, 10.0, 10.2])
+        ords = day_ords(4)
+        assert scan_recovery(closes, ords, 1, ords[1], 9.5, 30) == (1, 0, True)
+
+    def test_recovery_after_days(self):
+        """Days are counted in trading days from start_idx."""
+        closes = np.array([10.0, 9.5, 9.7, 9.9, 10.1])
+        ords = day_ords(5)
+        assert scan_recovery(closes, ords, 1, ords[1], 10.0, 30) == (4, 3, True)
+
+    def test_no_recovery_within_window(self):
+        """Without a hit the last scanned day and calendar days are returned."""
+        closes = np.array([10.0, 9.5, 9.6, 9.7, 10.5])
+        ords = np.array([0, 1, 4, 5, 6], dtype=np.int64)
+        assert scan_recovery(closes, ords, 1, 1, 10.0, 3) == (3, 4, False)
+
+    def test_calendar_days_from_requested_start(self):
+        """Non-trading start date: calendar days counted from start_ord."""
+        closes = np.array([10.0, 9.5, 9.6])
+        ords = np.array([0, 3, 4], dtype=np.int64)
+        assert scan_recovery(closes, ords, 1, 2, 10.0, 30) == (2, 2, False)
+
+    def test_empty_window(self):
+        """Start beyond the data returns (-1, -1, False)."""
+        closes = np.array([10.0, 9.5])
+        ords = day_ords(2)
+        assert scan_recovery(closes, ords, 2, ords[1] + 1, 10.0, 30) == (-1, -1, False)
+
+
+class TestDividendWindowMetrics:
+    """Test dividend_window_metrics kernel."""
+
+    COL = {name: i for i, name in enumerate(DIVIDEND_METRIC_COLUMNS)}
+
+    def test_gap_and_recovery(self):
+        """Gap, D+5 recovery and days to 50% gap on a simple series."""
+        ords = day_ords(12)
+        closes = np.array([10.0, 10.0, 10.0, 10.0, 9.0, 9.2, 9.6, 9.8, 9.9, 10.0, 10.1, 10.2])
+        volumes = np.full(12, 1000.0)
+        ex_ords = np.array([ords[4]])
+
+        out = dividend_window_metrics(ords, closes, volumes, ex_ords, 4, 7)[0]
+
+        assert out[self.COL['valid']] == 1.0
+        assert out[self.COL['p_d1']] == 10.0
+        assert out[self.COL['p_d0']] == 9.0
+        assert out[self.COL['gap_pct']] == pytest.approx(-100.0 / 9.0)
+        assert out[self.COL['recovery_d5_pct']] == pytest.approx(0.0)
+        assert out[self.COL['days_to_50pct_gap']] == 2
+        assert out[self.COL['trend_pre']] == pytest.approx(0.0)
+        assert out[self.COL['volume_mean_pre']] == 1000.0
+        assert out[self.COL['min_within_d3_flag']] == 0.0
+
+    def test_missing_d_minus_1_is_invalid(self):
+        """Ex-date at the start of the data has no D-1: row flagged invalid."""
+        ords = day_ords(5)
+        closes = np.array([9.0, 9.1, 9.2, 9.3, 9.4])
+        out = dividend_window_metrics(ords, closes, np.ones(5), np.array([ords[0]]), 10, 45)[0]
+
+        assert out[self.COL['valid']] == 0.0
+        assert np.isnan(out[self.COL['p_d1']])
+
+
+
+class TestRollingKernels:
+    """Test rolling min/max/mean kernels against pandas rolling."""
+
+    VALUES = np.array([3.0, 1.0, 4.0, 1.0, 5.0, np.nan, 9.0, 2.0, 6.0, 5.0, 3.0, 5.0])
+
+    def test_matches_pandas(self):
+        """Same values and NaN warm-up/propagation as pandas rolling(3)."""
+        expected = pd.Series(self.VALUES).rolling(3)
+
+        np.testing.assert_allclose(rolling_min(self.VALUES, 3), expected.min().to_numpy())
+        np.testing.assert_allclose(rolling_max(self.VALUES, 3), expected.max().to_numpy())
+        np.testing.assert_allclose(rolling_mean(self.VALUES, 3), expected.mean().to_numpy())
+
+    def test_window_longer_than_series(self):
+        """A window longer than the series yields only NaN."""
+        assert np.isnan(rolling_min(np.array([1.0, 2.0]), 3)).all()
+        assert np.isnan(rolling_mean(np.array([1.0, 2.0]), 3)).all()
+
+
+class TestRsiWilder:
+    """Test rsi_wilder kernel."""
+
+    def test_matches_ewm_reference(self):
+        """Wilder smoothing seeded with the SMA of the first deltas."""
+        close = np.array([44.0, 44.3, 44.1, 44.6, 45.2, 45.0, 45.8, 45.5, 46.1, 46.0])
+        period = 3
+        delta = pd.Series(close).diff()
+        gain = delta.clip(lower=0).to_numpy()
+        loss = (-delta).clip(lower=0).to_numpy()
+        avg_gain, avg_loss = gain[1:period + 1].mean(), loss[1:period + 1].mean()
+        expected = [100 - 100 / (1 + avg_gain / avg_loss)]
+        for i in range(period + 1, len(close)):
+            avg_gain = (avg_gain * (period - 1) + gain[i]) / period
+            avg_loss = (avg_loss * (period - 1) + loss[i]) / period
+            expected.append(100 - 100 / (1 + avg_gain / avg_loss))
+
+        rsi = rsi_wilder(close, period)
+
+        assert np.isnan(rsi[:period]).all()
+        np.testing.assert_allclose(rsi[period:], expected)
+
+    def test_no_losses(self):
+        """Only gains gives RSI 100; a flat series gives NaN."""
+        assert rsi_wilder(np.arange(6, dtype=float), 3)[-1] == 100.0
+        assert np.isnan(rsi_wilder(np.full(6, 5.0), 3)).all()
+
+
+class TestStochasticOscillator:
+    """Test stochastic_oscillator kernel."""
+
+    def test_matches_pandas(self):
+        """%K/%D match the pandas rolling formulation."""
+        close = np.array([10.0, 10.4, 10.1, 10.8, 11.0, 10.6, 10.9, 11.3, 11.1, 11.6])
+        low, high = close - 0.3, close + 0.2
+        lo = pd.Series(low).rolling(4).min()
+        hi = pd.Series(high).rolling(4).max()
+        expected_k = 100 * (close - lo) / (hi - lo)
+
+        k, d = stochastic_oscillator(low, high, close, 4, 3)
+
+        np.testing.assert_allclose(k, expected_k.to_numpy())
+        np.testing.assert_allclose(d, expected_k.rolling(3).mean().to_numpy())
+
+    def test_flat_range_is_nan(self):
+        """A zero high-low range gives NaN instead of a division by zero."""
+        flat = np.full(5, 7.0)
+        k, _ = stochastic_oscillator(flat, flat, flat, 3, 2)
+        assert np.isnan(k).all()
+
+
+class TestPriceSeries:
+    """Test PriceSeries construction."""
+
+    def test_from_frame(self):
+        """Arrays and day ordinals follow the DataFrame index."""
+        df = pd.DataFrame(
+            {'open': [10.0, 10.5], 'close': [10.2, 10.1]},
+            index=pd.DatetimeIndex(['2024-01-01', '2024-01-04'], name='date')
+        )
+
+        prices = PriceSeries.from_frame(df)
+
+        assert len(prices) == 2
+        assert prices.date_ords[1] - prices.date_ords[0] == 3
+        assert prices.closes.dtype == np.float64
+        assert prices.date_at(1) == pd.Timestamp('2024-01-04')
+
+
+class TestImportPath:
+    """Test that strategies is imported under a single module name."""
+
+    def test_no_src_strategies_imports(self):
+        """numba caches kernels by module name: src.strategies would recompile them."""
+        root = Path(__file__).parent.parent
+        offenders = [
+            str(path.relative_to(root))
+            for folder in ('app', 'src')
+            for path in (root / folder).rglob('*.py')
+            if re.search(r'^\s*(from|import)\s+src\.strategies\b',
+                         path.read_text(encoding='utf-8'), re.MULTILINE)
+        ]
+        assert offenders == []